@@ -1,63 +1,164 @@
 #app.py
-from flask import Flask,send_from_directory
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from flask_jwt_extended import JWTManager
+from flask import Flask, send_from_directory, request, abort, current_app
+import logging
 import os
 from dotenv import load_dotenv
-from extensions import db
+from sqlalchemy.engine import make_url
+from extensions import db, jwt, migrate
 from flask_cors import CORS
+from images import HASHED_NAME, IMAGE_SIZES, variant_path, schedule_variants
 
 # Load environment variables
 load_dotenv()
-app = Flask(__name__)
-
-app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY')
-jwt = JWTManager(app)
-
-# Enable CORS
-CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}})
-
-# Configure the database
-db_url = os.getenv('DATABASE_URL')
-if db_url and db_url.startswith("postgres://"):
-    db_url = db_url.replace("postgres://", "postgresql://", 1)
-
-app.config['SQLALCHEMY_DATABASE_URI'] = db_url
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Initialise extensions
-db.init_app(app)
-migrate = Migrate(app, db)  #  Initialise Flask-Migrate
-jwt = JWTManager(app)
-
-# Register Blueprints
-from routes import bp
-app.register_blueprint(bp)
 
 # backend/app.py
 
 #This block of code allows files to be uploaded to app.py for the property listings
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 UPLOAD_FOLDER = os.path.join(BASE_DIR, 'frontend', 'public', 'images')
-os.makedirs(os.path.join(UPLOAD_FOLDER, 'properties'), exist_ok=True)
-
-
-
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
 
+logger = logging.getLogger(__name__)
+
+
+def env_flag(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+def load_config():
+    """App settings from the environment (and .env)."""
+    db_url = os.getenv('DATABASE_URL')
+    if db_url and db_url.startswith("postgres://"):
+        db_url = db_url.replace("postgres://", "postgresql://", 1)
+
+    return {
+        'JWT_SECRET_KEY': os.getenv('JWT_SECRET_KEY'),
+        'SQLALCHEMY_DATABASE_URI': db_url,
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'UPLOAD_FOLDER': UPLOAD_FOLDER,
+        'MAX_CONTENT_LENGTH': 5 * 1024 * 1024,  # Max 5MB
+        # Connection pool, per worker process: keep workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+        # below the database's max_connections, and DB_POOL_SIZE >= threads per worker
+        'DB_POOL_SIZE': int(os.getenv('DB_POOL_SIZE', 5)),
+        'DB_MAX_OVERFLOW': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'DB_POOL_TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'DB_POOL_PRE_PING': env_flag('DB_POOL_PRE_PING', True),
+        'DB_POOL_RECYCLE': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        # Prometheus metrics at /metrics (see metrics.py)
+        'METRICS_ENABLED': env_flag('METRICS_ENABLED', True),
+    }
+
+
+def engine_options(config):
+    # pool_pre_ping/pool_recycle apply to every pool; in-memory SQLite uses a single
+    # shared connection (StaticPool), which takes no size options
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    }
+    url = config['SQLALCHEMY_DATABASE_URI']
+    if url and not (make_url(url).get_backend_name() == 'sqlite' and make_url(url).database in (None, '', ':memory:')):
+        options.update(pool_size=config['DB_POOL_SIZE'], max_overflow=config['DB_MAX_OVERFLOW'],
+                       pool_timeout=config['DB_POOL_TIMEOUT'])
+    return options
+
+
+def create_app(config=None):
+    """Builds the Flask app; config overrides the settings read from the environment."""
+    app = Flask(__name__)
+    app.config.update(load_config())
+    if config:
+        app.config.update(config)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+
+    # Enable CORS (scripts can only read the response headers exposed here)
+    CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}}, expose_headers=["X-Search-Truncated"])
+
+    import logs
+    logs.init_app(app)
+
+    # Initialise extensions
+    db.init_app(app)
+    migrate.init_app(app, db)  #  Initialise Flask-Migrate
+    jwt.init_app(app)
+    if app.config['METRICS_ENABLED']:
+        import metrics
+        metrics.init_app(app)
+
+    # Register Blueprints
+    from routes import bp
+    app.register_blueprint(bp)
+
+    os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'properties'), exist_ok=True)
+    app.add_url_rule('/uploads/<filename>', view_func=uploaded_file)
+    app.add_url_rule('/images/properties/<filename>', view_func=serve_uploaded_image)
+    app.add_url_rule('/images/properties/<size>/<filename>', view_func=serve_uploaded_image)
+    return app
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # Max 5MB
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
 
-@app.route('/uploads/<filename>')
 def uploaded_file(filename):
     return send_from_directory('../frontend/public/images/properties', filename)
 
-@app.route('/images/properties/<filename>')
-def serve_uploaded_image(filename):
-    return send_from_directory(os.path.join(app.config['UPLOAD_FOLDER'], 'properties'), filename)
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+def serve_uploaded_image(filename, size=None):
+    folder = os.path.join(current_app.config['UPLOAD_FOLDER'], 'properties')
+    match = HASHED_NAME.match(filename)
+    if not match:
+        # Bundled images (defaultprop.jpg etc.) keep their names, so they can't be cached forever
+        if size is not None:
+            abort(404)
+        return send_from_directory(folder, filename)
+
+    if size is None:
+        response = send_from_directory(folder, filename)
+        response.headers['Cache-Control'] = IMMUTABLE
+        return response
+
+    if size not in IMAGE_SIZES:
+        abort(404)
+
+    # Only browsers that name image/webp get it; a bare */* doesn't promise WebP decoding
+    fmt = 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpg'
+    path = variant_path(folder, size, filename, fmt)
+    if not os.path.exists(path):
+        # Any well-formed name gets here; only queue resizes for originals that exist
+        if not os.path.exists(os.path.join(folder, filename)):
+            abort(404)
+        # Not resized yet (or the queue was full): serve the original for now
+        schedule_variants(folder, filename)
+        response = send_from_directory(folder, filename)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.vary.add('Accept')
+        return response
+
+    response = send_from_directory(os.path.dirname(path), os.path.basename(path))
+    response.headers['Cache-Control'] = IMMUTABLE
+    response.vary.add('Accept')
+    return response
+
+
+def warm_up(app=None):
+    """Loads the model and the auth backend's client up front, and with an app,
+    the similar-properties index over its database.
+
+    Everything here is otherwise created on first use. Pre-forking servers can
+    call this in the master process so workers start with them already loaded.
+    """
+    from recomendation import warm_up as warm_up_model
+    from fauth import get_auth_backend
+
+    warm_up_model()
+    get_auth_backend().warm_up()
+    if app is not None:
+        from similarity import get_similarity_index
+        with app.app_context():
+            try:
+                get_similarity_index()
+            except Exception:
+                # e.g. a database not migrated yet; the first request builds it instead
+                logger.exception("Building the similarity index at startup failed")
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,54 @@
+# run this file to fill in postcode_district and region on properties stored before
+# those columns existed:  python backfill_locations.py [batch size]
+# Walks the table in primary-key order, reading only id/title/location and writing
+# each batch with one executemany UPDATE.
+import sys
+import time
+
+from sqlalchemy import bindparam, select, update
+
+from app import create_app
+from extensions import db
+from models import Property
+from data_versions import PROPERTIES, bump_data_version
+from utils import property_location_columns
+
+app = create_app()
+
+BATCH_SIZE = 5_000
+
+
+def backfill_locations(batch_size=BATCH_SIZE):
+    """Sets postcode_district and region wherever region is NULL; returns the number of rows updated."""
+    table = Property.__table__
+    statement = (update(table).where(table.c.id == bindparam('row_id'))
+                 .values(postcode_district=bindparam('postcode_district'), region=bindparam('region')))
+    updated = 0
+    last_id = 0
+    start = time.perf_counter()
+    while True:
+        rows = db.session.execute(
+            select(table.c.id, table.c.title, table.c.location)
+            .where(table.c.region.is_(None), table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return updated
+
+        db.session.execute(statement, [
+            {"row_id": row.id, **property_location_columns(row.title, row.location)} for row in rows
+        ])
+        bump_data_version(PROPERTIES)
+        db.session.commit()
+        updated += len(rows)
+        last_id = rows[-1].id
+        print(f"Updated {updated} properties (up to id {last_id}, "
+              f"{updated / (time.perf_counter() - start):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else BATCH_SIZE
+    with app.app_context():
+        total = backfill_locations(batch_size)
+        print(f"Backfill complete, {total} properties updated")
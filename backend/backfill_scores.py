@@ -0,0 +1,14 @@
+# run this file to score properties that have no stored score, or were scored by an older model
+
+import sys
+
+from app import create_app
+from scoring import backfill_scores, BACKFILL_BATCH_SIZE
+
+app = create_app()
+
+batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else BACKFILL_BATCH_SIZE
+
+with app.app_context():
+    total = backfill_scores(batch_size)
+    print(f"Backfill complete, {total} properties scored")
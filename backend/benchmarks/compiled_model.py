@@ -0,0 +1,77 @@
+# backend/benchmarks/compiled_model.py
+# Checks the compiled evaluator against model.predict_proba on the London listings
+# and compares single-row latency and batch throughput of both.
+# Run from the backend folder: python -m benchmarks.compiled_model
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from compiled_model import compile_model, load_compiled_model, save_compiled_model
+from features import listing_features
+from recomendation import FEATURES, get_model
+
+model = get_model()
+
+CSV_PATH = os.path.join(os.path.dirname(__file__), "..", "models", "realestate_data_london_2024_nov.csv")
+
+
+def load_london_features(path=CSV_PATH):
+    # Cleaned and engineered by features.py, exactly as for training and serving
+    _, X = listing_features(pd.read_csv(path, encoding="utf-8-sig"))
+    return pd.DataFrame(X, columns=FEATURES)
+
+
+def check_parity(compiled, X):
+    expected = model.predict_proba(X)
+    actual = compiled.predict_proba(X.to_numpy())
+    max_error = np.abs(expected - actual).max()
+    assert np.allclose(expected, actual, rtol=0, atol=1e-9), f"max abs error {max_error}"
+    assert (model.predict(X) == compiled.predict(X.to_numpy())).all(), "labels differ"
+    print(f"parity: {len(X)} London listings, max |Δp| = {max_error:.2e}")
+
+
+def time_per_call(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.median(timings)
+
+
+def run(repeats):
+    start = time.perf_counter()
+    compiled = compile_model(model)
+    print(f"compile: {compiled.n_trees} trees, {len(compiled.value)} nodes in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    X = load_london_features()
+    check_parity(compiled, X)
+
+    # The same arrays after a round trip through the memory-mapped .npy artifact
+    with tempfile.TemporaryDirectory() as tmp:
+        save_compiled_model(compiled, os.path.join(tmp, "artifact"))
+        mapped = load_compiled_model(os.path.join(tmp, "artifact"))
+        assert (mapped.predict_proba(X.to_numpy()) == compiled.predict_proba(X.to_numpy())).all(), "artifact differs"
+        print("parity: memory-mapped artifact matches the in-memory compile")
+
+    row = X.iloc[:1]
+    row_array = row.to_numpy()
+    sk_single = time_per_call(lambda: model.predict_proba(row), repeats)
+    cm_single = time_per_call(lambda: compiled.predict_proba(row_array), repeats)
+    print(f"single row p50   sklearn {sk_single * 1e6:8.1f} us   compiled {cm_single * 1e6:8.1f} us   ({sk_single / cm_single:.1f}x)")
+
+    X_array = X.to_numpy()
+    sk_batch = time_per_call(lambda: model.predict_proba(X), max(repeats // 10, 3))
+    cm_batch = time_per_call(lambda: compiled.predict_proba(X_array), max(repeats // 10, 3))
+    print(f"batch of {len(X)} rows/s  sklearn {len(X) / sk_batch:10.0f}   compiled {len(X) / cm_batch:10.0f}   ({sk_batch / cm_batch:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compiled evaluator parity and latency")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+    run(args.repeats)
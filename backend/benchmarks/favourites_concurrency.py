@@ -0,0 +1,100 @@
+# backend/benchmarks/favourites_concurrency.py
+# Stress test for the favourites writes. For each round, N threads save the same
+# (user, property) at the same moment and then race to remove it. Exactly one save
+# must get 201 and exactly one remove must get 200, with no duplicate rows and no
+# 500s. Finishes with a bulk add/remove race.
+# Run from the backend folder: python -m benchmarks.favourites_concurrency
+# Uses a scratch SQLite file unless BENCH_DATABASE_URL points at a scratch PostgreSQL.
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL",
+                                       "sqlite:///" + os.path.join(tempfile.gettempdir(), "investr_favourites.db"))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import func
+
+from app import create_app
+from benchmarks.seed import seed
+from extensions import db
+from models import Favorite
+
+app = create_app()
+
+USER = "user-0"
+
+
+def race(threads, request):
+    # Every thread fires at the same moment; returns the status codes
+    barrier = threading.Barrier(threads)
+    statuses = []
+    lock = threading.Lock()
+
+    def worker():
+        client = app.test_client()
+        barrier.wait()
+        status = request(client)
+        with lock:
+            statuses.append(status)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return Counter(statuses)
+
+
+def duplicate_rows():
+    with app.app_context():
+        total = db.session.query(func.count(Favorite.id)).scalar()
+        distinct = db.session.query(Favorite.user_id, Favorite.property_id).distinct().count()
+        return total - distinct
+
+
+def run(threads, rounds):
+    with app.app_context():
+        seed(db.engine, 1_000, n_users=1, favourites_per_user=0)
+        headers = {"Authorization": "Bearer " + create_access_token(identity=USER)}
+
+    failures = 0
+    start = time.perf_counter()
+    for property_id in range(1, rounds + 1):
+        saves = race(threads, lambda c: c.post('/api/favourites', json={"property_id": property_id}, headers=headers).status_code)
+        removes = race(threads, lambda c: c.delete('/api/favourites', json={"property_id": property_id}, headers=headers).status_code)
+        if saves != Counter({201: 1, 400: threads - 1}) or removes != Counter({200: 1, 404: threads - 1}):
+            failures += 1
+            print(f"round {property_id}: saves {dict(saves)} removes {dict(removes)}")
+
+    ids = list(range(1, 51))
+    bulk = race(threads, lambda c: c.post('/api/favourites/bulk', json={"add": ids}, headers=headers).status_code)
+    with app.app_context():
+        saved = db.session.query(func.count(Favorite.id)).filter(Favorite.user_id == USER).scalar()
+    elapsed = time.perf_counter() - start
+
+    duplicates = duplicate_rows()
+    print(f"{rounds} rounds x {threads} threads in {elapsed:.1f}s ({engine_name()})")
+    print(f"single save/remove rounds with the wrong outcome: {failures}")
+    print(f"bulk add race: statuses {dict(bulk)}, {saved} favourites saved (expected {len(ids)})")
+    print(f"duplicate (user, property) rows: {duplicates}")
+    ok = failures == 0 and duplicates == 0 and saved == len(ids) and set(bulk) == {200}
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+def engine_name():
+    with app.app_context():
+        return db.engine.url.render_as_string(hide_password=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent favourites stress test")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.threads, args.rounds) else 1)
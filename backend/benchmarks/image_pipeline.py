@@ -0,0 +1,77 @@
+# backend/benchmarks/image_pipeline.py
+# What an upload costs on the request thread now (hash + save + queue) against
+# resizing inline, and how many bytes a property card downloads per format.
+# Run from the backend folder: python -m benchmarks.image_pipeline [--width 4000 --height 3000]
+import argparse
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from images import store_upload, make_variants, schedule_variants, variant_path, variants_ready, IMAGE_SIZES
+
+
+def photo_like(width, height, seed=0):
+    # Smooth gradients plus noise: compresses roughly like a real photo
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.dstack([(x * 255 // width), (y * 255 // height), ((x + y) * 127 // (width + height))])
+    noise = rng.integers(-12, 12, size=base.shape)
+    buf = io.BytesIO()
+    Image.fromarray(np.clip(base + noise, 0, 255).astype('uint8')).save(buf, 'JPEG', quality=90)
+    return buf.getvalue()
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(width, height, repeat):
+    data = photo_like(width, height)
+    folder = tempfile.mkdtemp(prefix="investr_images_")
+    upload = lambda: FileStorage(io.BytesIO(data), filename="photo.jpg")
+
+    filename = store_upload(upload(), folder)
+    inline = timed(lambda: make_variants(folder, filename), repeat)
+    # Fresh folder each time, so the write isn't skipped as a duplicate
+    store = timed(lambda: store_upload(upload(), tempfile.mkdtemp(dir=folder)), repeat)
+    duplicate = timed(lambda: store_upload(upload(), folder), repeat)
+
+    print(f"upload {width}x{height}, {len(data) / 1024:,.0f} KB")
+    print(f"request thread, resizing inline:                  {(store + inline) * 1000:7.1f} ms")
+    print(f"request thread, hash + save (resize queued):      {store * 1000:7.1f} ms")
+    print(f"request thread, duplicate upload:                 {duplicate * 1000:7.1f} ms")
+    print(f"background resize (all variants):                 {inline * 1000:7.1f} ms")
+
+    for size in IMAGE_SIZES:
+        sizes = {fmt: os.path.getsize(variant_path(folder, size, filename, fmt)) for fmt in ('jpg', 'webp')}
+        print(f"{size:>5}: jpg {sizes['jpg'] / 1024:6.1f} KB, webp {sizes['webp'] / 1024:6.1f} KB "
+              f"(original {len(data) / 1024:,.0f} KB)")
+
+    # End to end through the pool
+    filename = store_upload(FileStorage(io.BytesIO(photo_like(width, height, seed=1)), filename="other.jpg"), folder)
+    start = time.perf_counter()
+    schedule_variants(folder, filename)
+    queued = time.perf_counter() - start
+    while not variants_ready(folder, filename):
+        time.sleep(0.005)
+    print(f"schedule_variants returned in {queued * 1000:.2f} ms, variants ready after "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upload and resize timings")
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.width, args.height, args.repeat)
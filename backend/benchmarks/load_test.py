@@ -0,0 +1,250 @@
+# backend/benchmarks/load_test.py
+# End-to-end load test: seeds a scratch database with 10k, 100k and 1M synthetic
+# listings (benchmarks/seed.py, modelled on the London CSV) plus favourites for a
+# few thousand users, boots the app under gunicorn with the stub auth backend, and
+# drives each endpoint in turn with a fixed number of keep-alive clients. Nothing
+# here needs Firebase credentials: the stub replaces sign-in, and the app loads no
+# Firebase Admin key at boot.
+# Throughput and p50/p95/p99 latency are reported per endpoint and dataset size.
+#
+#   python -m benchmarks.load_test --save baseline.json      record a baseline
+#   python -m benchmarks.load_test --compare baseline.json   compare a later run against it
+#
+# --compare exits with status 1 when a p95 or the throughput is worse than the
+# baseline by more than --tolerance. Seeded databases are kept in the temp folder
+# and reused by later runs (--reseed rebuilds them). Run from the backend folder.
+# Uses scratch SQLite files unless BENCH_DATABASE_URL points at a scratch PostgreSQL
+# (which is then reseeded for every size).
+import argparse
+import datetime
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, func, select
+
+from benchmarks.seed import seed
+from benchmarks.serving import BACKEND_DIR, percentile, start_server
+from models import Favorite, Property
+
+N_USERS = 5_000
+FAVOURITES_PER_USER = 10
+
+
+def property_search(rng, tokens):
+    params = [f"min_price={rng.randrange(100_000, 1_500_000, 10_000)}", "limit=20"]
+    if rng.random() < 0.5:
+        params.append(f"min_bedrooms={rng.randint(1, 4)}")
+    if rng.random() < 0.5:
+        params.append("location=" + rng.choice(["North+London", "South+London", "East+London",
+                                                "West+London", "Central+London"]))
+    return "GET", "/api/properties?" + "&".join(params), None, {}
+
+
+def favourites(rng, tokens):
+    return "GET", "/api/favourites", None, {"Authorization": "Bearer " + rng.choice(tokens)}
+
+
+def recommend(rng, tokens):
+    body = {"price": rng.randrange(200_000, 2_000_000, 5_000),
+            "bedrooms": rng.randint(1, 5), "bathrooms": rng.randint(1, 3)}
+    return "POST", "/api/recommend", json.dumps(body), {"Content-Type": "application/json"}
+
+
+def simulate(rng, tokens):
+    price = rng.randrange(200_000, 1_500_000, 5_000)
+    body = {"property_price": price, "down_payment": price // 4, "mortgage_rate": rng.choice([3.5, 4.5, 5.5]),
+            "rental_income": rng.randrange(1_000, 4_000, 50), "appreciation_rate": 3,
+            "years": rng.choice([10, 20, 30]), "mortgage_term": 25, "rent_growth": 2}
+    return "POST", "/api/simulate", json.dumps(body), {"Content-Type": "application/json"}
+
+
+ENDPOINTS = {
+    "GET /api/properties": property_search,
+    "GET /api/favourites": favourites,
+    "POST /api/recommend": recommend,
+    "POST /api/simulate": simulate,
+}
+
+
+def database_url(n_properties):
+    return os.getenv("BENCH_DATABASE_URL") or "sqlite:///" + os.path.join(
+        tempfile.gettempdir(), f"investr_load_{n_properties}.db")
+
+
+def prepare_database(url, n_properties, reseed):
+    engine = create_engine(url)
+    try:
+        if not reseed and url.startswith("sqlite"):
+            try:
+                with engine.connect() as connection:
+                    # Fails on a file seeded before a schema change, which is then reseeded
+                    connection.execute(select(Property.__table__).limit(1)).all()
+                    counts = (connection.scalar(select(func.count()).select_from(Property.__table__)),
+                              connection.scalar(select(func.count()).select_from(Favorite.__table__)))
+                if counts == (n_properties, N_USERS * FAVOURITES_PER_USER):
+                    return False
+            except Exception:
+                pass
+        seed(engine, n_properties, n_users=N_USERS, favourites_per_user=FAVOURITES_PER_USER)
+        return True
+    finally:
+        engine.dispose()
+
+
+def drive(port, send, concurrency, duration, tokens):
+    # Closed loop: every client sends its next request as soon as the last one returns
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(n):
+        rng = random.Random(n)
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        mine, failed = [], 0
+        while time.perf_counter() < stop_at:
+            method, path, body, headers = send(rng, tokens)
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            mine.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def access_tokens():
+    from flask_jwt_extended import create_access_token
+
+    from app import create_app
+    with create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"}).app_context():
+        return [create_access_token(identity=f"user-{u}") for u in range(N_USERS)]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, endpoints, args):
+    tokens = access_tokens()
+    report = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "settings": {"concurrency": args.concurrency, "duration_s": args.duration, "workers": args.workers,
+                     "threads": args.threads, "pool_size": args.pool_size},
+        "results": {},
+    }
+    print(f"{args.concurrency} clients, {args.duration}s per endpoint, "
+          f"{args.workers} workers x {args.threads} threads, pool {args.pool_size}")
+    for n_properties in sizes:
+        url = database_url(n_properties)
+        start = time.perf_counter()
+        if prepare_database(url, n_properties, args.reseed):
+            print(f"\nseeded {n_properties:,} properties and {N_USERS * FAVOURITES_PER_USER:,} favourites "
+                  f"in {time.perf_counter() - start:.0f}s")
+        print(f"\n{n_properties:,} properties")
+        print(f"  {'endpoint':22s} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'errors':>7}")
+
+        rows = report["results"][str(n_properties)] = {}
+        server = start_server(args.port, args.workers, args.threads, args.pool_size, DATABASE_URL=url)
+        try:
+            for name in endpoints:
+                send = ENDPOINTS[name]
+                drive(args.port, send, args.concurrency, args.warmup, tokens)
+                latencies, errors = drive(args.port, send, args.concurrency, args.duration, tokens)
+                row = rows[name] = {
+                    "requests": len(latencies),
+                    "requests_per_s": round(len(latencies) / args.duration, 1),
+                    "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+                    "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+                    "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+                    "errors": errors,
+                }
+                print(f"  {name:22s} {row['requests_per_s']:>8.1f} {row['p50_ms']:>7.1f}ms "
+                      f"{row['p95_ms']:>7.1f}ms {row['p99_ms']:>7.1f}ms {errors:>7}")
+        finally:
+            server.terminate()
+            server.wait()
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """Prints the change against baseline and returns the regressions beyond tolerance."""
+    print(f"\ncompared with baseline from {baseline.get('created')} (commit {baseline.get('commit')})")
+    if baseline.get("settings") != report["settings"]:
+        print(f"  settings differ: baseline {baseline.get('settings')}")
+    regressions = []
+    for size, rows in report["results"].items():
+        for name, row in rows.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if not before:
+                continue
+            changes = {key: row[key] / before[key] - 1 if before[key] else 0.0
+                       for key in ("requests_per_s", "p50_ms", "p95_ms", "p99_ms")}
+            print(f"  {int(size):>9,} {name:22s} " + "  ".join(
+                f"{key.replace('_ms', '').replace('requests_per_s', 'req/s')} {change:+6.1%}"
+                for key, change in changes.items()))
+            if changes["p95_ms"] > tolerance:
+                regressions.append(f"{size} {name}: p95 {before['p95_ms']} -> {row['p95_ms']} ms")
+            if changes["requests_per_s"] < -tolerance:
+                regressions.append(f"{size} {name}: {before['requests_per_s']} -> {row['requests_per_s']} req/s")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end load test of the API against seeded databases")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), default=list(ENDPOINTS), metavar="ENDPOINT",
+                        help="any of: " + ", ".join(f'"{name}"' for name in ENDPOINTS))
+    parser.add_argument("--concurrency", type=int, default=16, help="client connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of unrecorded requests first")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--port", type=int, default=5098)
+    parser.add_argument("--reseed", action="store_true", help="rebuild the seeded databases")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file from an earlier --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95/throughput regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.endpoints, args)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nsaved {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"  REGRESSION {regression}")
+        raise SystemExit(1 if regressions else 0)
@@ -0,0 +1,160 @@
+# backend/benchmarks/logging_overhead.py
+# What logging costs the request thread.
+#  1. Per call: print() (what the routes used to do), a logger.debug() below the
+#     module's level, a queued logger.info() (logs.py), and the same info() through
+#     a synchronous JSON StreamHandler, all writing to a line-buffered sink.
+#  2. Per request: property searches and favourite save/remove through the test
+#     client, with stdout piped to this process like a log collector, once read as
+#     fast as possible and once by a slow reader (a backed-up log pipeline), where
+#     print() blocks the request once the pipe buffer is full. Pass --before-ref
+#     <git ref> to run the same requests against an older checkout too. Configs are
+#     interleaved over several rounds and the best round is kept.
+# Run from the backend folder: python -m benchmarks.logging_overhead [--before-ref <ref>]
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "investr_logging.db"))
+
+WORKER = """
+import json, sys, time
+from flask_jwt_extended import create_access_token
+from app import create_app
+app = create_app()
+client = app.test_client()
+with app.app_context():
+    headers = {"Authorization": "Bearer " + create_access_token(identity="user-0")}
+n = int(sys.argv[1])
+
+def search(i):
+    client.get(f'/api/properties?limit=20&min_price={100_000 + i % 200 * 5_000}')
+
+def favourite(i):
+    client.post('/api/favourites', json={"property_id": 1 + i % 500}, headers=headers)
+    client.delete('/api/favourites', json={"property_id": 1 + i % 500}, headers=headers)
+
+timings = {}
+for name, send in (("GET /api/properties", search), ("POST+DELETE /api/favourites", favourite)):
+    for i in range(100):
+        send(i)
+    start = time.perf_counter()
+    for i in range(n):
+        send(i)
+    timings[name] = (time.perf_counter() - start) / n
+sys.stdout.flush()
+sys.stderr.write("RESULT " + json.dumps(timings) + "\\n")
+"""
+
+
+def per_call(n):
+    sink = open(os.devnull, "w", buffering=1)
+    line = "DEBUG: Searching properties with filters - Locations: [], Min Price: 250000, Max Price: None"
+
+    import logs
+
+    logs.configure_logging()
+    logs._handlers[0].setStream(sink)
+    queued = logging.getLogger("bench.queued")
+    queued.setLevel(logging.INFO)
+
+    sync = logging.getLogger("bench.sync")
+    sync.propagate = False
+    sync_handler = logging.StreamHandler(sink)
+    sync_handler.setFormatter(logs.JsonLineFormatter())
+    sync_handler.addFilter(logs.RedactingFilter())
+    sync.addHandler(sync_handler)
+
+    calls = {
+        "print() (before)": lambda i: print(line, i, file=sink),
+        "logger.debug() below level": lambda i: queued.debug("Searching properties: min_price=%s", i),
+        "logger.info() queued": lambda i: queued.info("Searching properties: min_price=%s", i),
+        "logger.info() synchronous JSON": lambda i: sync.info("Searching properties: min_price=%s", i),
+    }
+    print(f"per call, {n} calls each (request-thread time)")
+    for name, call in calls.items():
+        start = time.perf_counter()
+        for i in range(n):
+            call(i)
+        elapsed = (time.perf_counter() - start) / n
+        print(f"  {name:32s} {elapsed * 1e6:8.2f} us")
+    logs._stop_listener()
+
+
+def per_request(tree, n, env_overrides, reader_delay=0.0):
+    # Unbuffered, as under a process manager or in a container
+    env = dict(os.environ, DATABASE_URL=DATABASE_URL, JWT_SECRET_KEY="benchmark-secret", AUTH_BACKEND="stub",
+               PYTHONUNBUFFERED="1", **env_overrides)
+    process = subprocess.Popen([sys.executable, "-c", WORKER, str(n)], cwd=tree, env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    # Drain stdout the way a log collector would
+    lines = [0]
+
+    def drain():
+        for _ in process.stdout:
+            lines[0] += 1
+            if reader_delay:
+                time.sleep(reader_delay)
+    reader = threading.Thread(target=drain)
+    reader.start()
+    stderr = process.stderr.read()
+    process.wait()
+    reader.join()
+    if process.returncode != 0:
+        raise RuntimeError(stderr[-2000:])
+    result = next(line for line in stderr.splitlines() if line.startswith("RESULT "))
+    return json.loads(result[len("RESULT "):]), lines[0]
+
+
+def checkout(ref, directory):
+    archive = subprocess.run(["git", "archive", ref, "backend"], cwd=os.path.dirname(BACKEND_DIR),
+                             capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", directory], input=archive, check=True)
+    return os.path.join(directory, "backend")
+
+
+def run(calls, requests, rounds, reader_delay, before_ref):
+    per_call(calls)
+
+    os.environ["DATABASE_URL"] = DATABASE_URL
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+    from app import create_app
+    from benchmarks.seed import seed
+    from extensions import db
+    with create_app().app_context():
+        seed(db.engine, 5_000, n_users=10, favourites_per_user=0)
+
+    runs = [("after, LOG_LEVEL=INFO", BACKEND_DIR, {"LOG_LEVEL": "INFO"}),
+            ("after, LOG_LEVEL=DEBUG", BACKEND_DIR, {"LOG_LEVEL": "DEBUG"})]
+    with tempfile.TemporaryDirectory() as tmp:
+        if before_ref:
+            runs.insert(0, (f"before ({before_ref}, print)", checkout(before_ref, tmp), {}))
+        for title, delay in (("fast reader", 0.0), (f"slow reader, {reader_delay * 1e3:g} ms per line", reader_delay)):
+            best = {label: {} for label, _, _ in runs}
+            lines = {}
+            for _ in range(rounds):
+                for label, tree, env in runs:
+                    timings, lines[label] = per_request(tree, requests, env, delay)
+                    for name, seconds in timings.items():
+                        best[label][name] = min(best[label].get(name, float("inf")), seconds)
+            print(f"\nper request, {requests} requests each, {title}, best of {rounds}")
+            for label, _, _ in runs:
+                cells = "  ".join(f"{name} {seconds * 1e6:8.1f} us" for name, seconds in best[label].items())
+                print(f"  {label:30s} {cells}  ({lines[label]} log lines)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Request-thread cost of logging")
+    parser.add_argument("--calls", type=int, default=50_000)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--reader-delay", type=float, default=0.005, help="seconds the slow reader spends per line")
+    parser.add_argument("--before-ref", help="git ref of an older tree to compare against, e.g. a commit still using print()")
+    args = parser.parse_args()
+    run(args.calls, args.requests, args.rounds, args.reader_delay, args.before_ref)
@@ -0,0 +1,88 @@
+# backend/benchmarks/metrics_overhead.py
+# Cost of the /metrics instrumentation: the same requests through two apps, one
+# with METRICS_ENABLED off and one with it on. Short blocks of each are interleaved
+# (the SQL listeners are detached during the "off" blocks, since they are process
+# wide) and the median block is reported, so drift on a busy machine hits both.
+# GET / is the worst case: almost no work of its own to hide the overhead behind.
+# Run from the backend folder: python -m benchmarks.metrics_overhead [--blocks 30]
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL",
+                                       "sqlite:///" + os.path.join(tempfile.gettempdir(), "investr_metrics.db"))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("AUTH_BACKEND", "stub")
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import metrics
+from app import create_app
+from benchmarks.seed import seed
+from extensions import db
+
+REQUESTS = {
+    "GET /": lambda client, i: client.get('/'),
+    "GET /api/properties": lambda client, i: client.get(f'/api/properties?limit=20&min_price={100_000 + i % 200 * 5_000}'),
+    "POST /api/recommend": lambda client, i: client.post(
+        '/api/recommend', json={"price": 300_000 + i % 50 * 10_000, "bedrooms": 2, "bathrooms": 1}),
+}
+LISTENERS = (("before_cursor_execute", metrics._before_cursor_execute),
+             ("after_cursor_execute", metrics._after_cursor_execute))
+
+
+def sql_listeners(attached):
+    for name, listener in LISTENERS:
+        if attached and not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+        elif not attached and event.contains(Engine, name, listener):
+            event.remove(Engine, name, listener)
+
+
+def block(client, send, size):
+    start = time.perf_counter()
+    for i in range(size):
+        send(client, i)
+    return (time.perf_counter() - start) / size
+
+
+def run(blocks, block_size, n_properties):
+    off = create_app({"METRICS_ENABLED": False})
+    on = create_app({"METRICS_ENABLED": True})
+    with off.app_context():
+        seed(db.engine, n_properties, n_users=10, favourites_per_user=0)
+    clients = {"off": off.test_client(), "on": on.test_client()}
+
+    print(f"{blocks} blocks of {block_size} requests per endpoint and mode, median block")
+    print(f"{'endpoint':22s} {'metrics off':>12} {'metrics on':>12} {'overhead':>18}")
+    for name, send in REQUESTS.items():
+        timings = {"off": [], "on": []}
+        for mode, client in clients.items():
+            sql_listeners(mode == "on")
+            block(client, send, block_size)  # warm-up
+        for _ in range(blocks):
+            for mode, client in clients.items():
+                sql_listeners(mode == "on")
+                timings[mode].append(block(client, send, block_size))
+        off_time, on_time = statistics.median(timings["off"]), statistics.median(timings["on"])
+        print(f"{name:22s} {off_time * 1e6:>10.1f}us {on_time * 1e6:>10.1f}us "
+              f"{(on_time - off_time) * 1e6:>7.1f}us ({(on_time / off_time - 1) * 100:+.1f}%)")
+
+    # Scraping is the other recurring cost
+    client = clients["on"]
+    start = time.perf_counter()
+    for _ in range(50):
+        body = client.get('/metrics').data
+    print(f"GET /metrics: {(time.perf_counter() - start) / 50 * 1000:.2f} ms, {len(body)} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Request overhead of the Prometheus instrumentation")
+    parser.add_argument("--blocks", type=int, default=30)
+    parser.add_argument("--block-size", type=int, default=100)
+    parser.add_argument("--properties", type=int, default=20_000)
+    args = parser.parse_args()
+    run(args.blocks, args.block_size, args.properties)
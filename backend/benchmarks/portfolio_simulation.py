@@ -0,0 +1,82 @@
+# backend/benchmarks/portfolio_simulation.py
+# One POST /api/simulate/portfolio against the same number of /api/simulate calls
+# (what Simulation.js does per property), for growing portfolio sizes. Also checks
+# that each property's figures match its single-property simulation.
+# Run from the backend folder: python -m benchmarks.portfolio_simulation
+# Uses a scratch SQLite file unless BENCH_DATABASE_URL points at a scratch PostgreSQL.
+import argparse
+import os
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL",
+                                       "sqlite:///" + os.path.join(tempfile.gettempdir(), "investr_portfolio.db"))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from benchmarks.seed import seed
+from extensions import db
+from models import Property
+
+app = create_app()
+
+ASSUMPTIONS = {"down_payment_percent": 25, "mortgage_rate": 4.5, "appreciation_rate": 2.3,
+               "years": 25, "mortgage_term": 25}
+
+
+def single_simulation(client, property_id, price, rent):
+    return client.post('/api/simulate', json={
+        "property_price": price,
+        "down_payment": price * ASSUMPTIONS["down_payment_percent"] / 100,
+        "mortgage_rate": ASSUMPTIONS["mortgage_rate"],
+        "rental_income": rent,
+        "appreciation_rate": ASSUMPTIONS["appreciation_rate"],
+        "years": ASSUMPTIONS["years"],
+        "mortgage_term": ASSUMPTIONS["mortgage_term"],
+    }).json
+
+
+def run(sizes, repeat):
+    with app.app_context():
+        seed(db.engine, max(sizes), n_users=1, favourites_per_user=0)
+        headers = {"Authorization": "Bearer " + create_access_token(identity="user-0")}
+        prices = dict(db.session.query(Property.id, Property.price).all())
+
+    client = app.test_client()
+    ok = True
+    print(f"{'properties':>10} {'portfolio':>12} {'per-property calls':>19} {'speedup':>8}")
+    for size in sizes:
+        ids = list(range(1, size + 1))
+        body = {**ASSUMPTIONS, "property_ids": ids}
+
+        best_portfolio = best_single = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            portfolio = client.post('/api/simulate/portfolio', json=body, headers=headers).json
+            best_portfolio = min(best_portfolio, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            singles = [single_simulation(client, i, prices[i], portfolio["properties"][n]["rental_income"])
+                       for n, i in enumerate(ids)]
+            best_single = min(best_single, time.perf_counter() - start)
+
+        for row, single in zip(portfolio["properties"], singles):
+            if abs(row["projected_net_equity"] - single["projected_net_equity"]) > 0.02:
+                ok = False
+                print(f"mismatch for property {row['id']}: {row['projected_net_equity']} vs {single['projected_net_equity']}")
+
+        print(f"{size:>10} {best_portfolio * 1000:>10.1f}ms {best_single * 1000:>17.1f}ms "
+              f"{best_single / best_portfolio:>7.1f}x")
+
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Portfolio simulation vs per-property calls")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    raise SystemExit(0 if run(args.sizes, args.repeat) else 1)
@@ -0,0 +1,78 @@
+# backend/benchmarks/recommend_batch.py
+# Compares N single /api/recommend calls against one /api/recommend/batch call,
+# with the prediction cache cleared, and N repeat views served from the cache.
+# Run from the backend folder: python -m benchmarks.recommend_batch --n 50
+import argparse
+import os
+import random
+import time
+
+# The recommend routes never touch the database, an in-memory SQLite URL is enough
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+from app import create_app
+from recomendation import recommendation_cache
+
+app = create_app()
+
+PROPERTY_TYPES = ["Detached", "Flat", "House", "Semi_Detached", "Terraced", "Other"]
+REGIONS = ["North", "South", "East", "West", "Central", "Other"]
+
+
+def sample_properties(n, seed=42):
+    rng = random.Random(seed)
+    return [{
+        "price": rng.randrange(250_000, 3_000_000, 5_000),
+        "bedrooms": rng.randint(1, 6),
+        "bathrooms": rng.randint(1, 4),
+        "sizeSqFeetMax": rng.randrange(400, 4_000, 50),
+        "property_type": rng.choice(PROPERTY_TYPES),
+        "region": rng.choice(REGIONS)
+    } for _ in range(n)]
+
+
+def run(n, repeats):
+    client = app.test_client()
+    properties = sample_properties(n)
+
+    # Warm up both paths so model/JIT caches don't skew the first measurement
+    client.post('/api/recommend', json=properties[0])
+    client.post('/api/recommend/batch', json={"properties": properties[:2]})
+
+    single_times, repeat_times, batch_times = [], [], []
+    for _ in range(repeats):
+        recommendation_cache.clear()
+        start = time.perf_counter()
+        first = [client.post('/api/recommend', json=prop).get_json() for prop in properties]
+        single_times.append(time.perf_counter() - start)
+
+        # Same properties again: every prediction is a cache hit
+        start = time.perf_counter()
+        again = [client.post('/api/recommend', json=prop).get_json() for prop in properties]
+        repeat_times.append(time.perf_counter() - start)
+        assert first == again, "recommendations changed between views"
+
+        recommendation_cache.clear()
+        start = time.perf_counter()
+        response = client.post('/api/recommend/batch', json={"properties": properties})
+        assert response.status_code == 200, response.get_json()
+        assert len(response.get_json()["results"]) == n
+        batch_times.append(time.perf_counter() - start)
+
+    single = min(single_times)
+    repeat = min(repeat_times)
+    batch = min(batch_times)
+    print(f"properties per run: {n} (best of {repeats})")
+    print(f"{n} x /api/recommend:      {single * 1000:9.1f} ms  {n / single:9.1f} properties/s")
+    print(f"{n} x repeat views:        {repeat * 1000:9.1f} ms  {n / repeat:9.1f} properties/s")
+    print(f"1 x /api/recommend/batch: {batch * 1000:9.1f} ms  {n / batch:9.1f} properties/s")
+    print(f"speed-up: {single / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Single vs batch recommendation throughput")
+    parser.add_argument("--n", type=int, default=50, help="properties per run")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(args.n, args.repeats)
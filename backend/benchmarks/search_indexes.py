@@ -0,0 +1,96 @@
+# backend/benchmarks/search_indexes.py
+# Seeds a scratch database and reports EXPLAIN plans and p50/p95 latencies of the
+# /api/properties and /api/favourites queries without and with the search indexes.
+# Property searches are measured as the first page of the paginated list view.
+# Run from the backend folder: python -m benchmarks.search_indexes --rows 100000
+# The target database is dropped and recreated, never point it at real data.
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import and_, create_engine, func, select, text
+
+from benchmarks.seed import seed
+from models import SCORE_SORT_KEY, Favorite, Property
+
+QUERIES = {
+    "location IN + price range, sort=price": select(Property).where(and_(
+        Property.location.in_(["North London", "East London"]),
+        Property.price >= 400_000, Property.price <= 600_000,
+    )).order_by(Property.price, Property.id).limit(50),
+    "price range, sort=price": select(Property).where(and_(
+        Property.price >= 1_000_000, Property.price <= 1_200_000,
+    )).order_by(Property.price, Property.id).limit(50),
+    "property_type (case-insensitive) + max price": select(Property).where(and_(
+        func.lower(Property.property_type) == "bungalow", Property.price <= 350_000,
+    )).order_by(Property.price, Property.id).limit(50),
+    "min bedrooms + price range": select(Property).where(and_(
+        Property.bedrooms >= 5, Property.price >= 500_000, Property.price <= 900_000,
+    )).order_by(Property.price, Property.id).limit(50),
+    "sort=newest": select(Property).order_by(Property.created_at.desc(), Property.id.desc()).limit(50),
+    "sort=score": select(Property).order_by(SCORE_SORT_KEY.desc(), Property.id.desc()).limit(50),
+    # A page deep into the list: the keyset filter GET /api/properties sends with a cursor
+    "sort=score, deep page": select(Property).where(and_(
+        SCORE_SORT_KEY <= 50, (SCORE_SORT_KEY < 50) | (Property.id < 50_000),
+    )).order_by(SCORE_SORT_KEY.desc(), Property.id.desc()).limit(50),
+    "favourites for one user": select(Property).join(Favorite, Favorite.property_id == Property.id)
+        .where(Favorite.user_id == "user-42"),
+}
+
+
+def explain(connection, statement):
+    sql = str(statement.compile(connection, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN " if connection.dialect.name == "sqlite" else "EXPLAIN "
+    rows = connection.execute(text(prefix + sql)).fetchall()
+    return [str(row[-1]) for row in rows]
+
+
+def time_query(connection, statement, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        connection.execute(statement).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 95)
+
+
+def secondary_indexes():
+    return [index for table in (Property.__table__, Favorite.__table__) for index in table.indexes]
+
+
+def report(engine, label, repeats):
+    print(f"\n=== {label} ===")
+    with engine.connect() as connection:
+        connection.execute(text("ANALYZE"))
+        for name, statement in QUERIES.items():
+            p50, p95 = time_query(connection, statement, repeats)
+            print(f"{name:48s} p50 {p50:8.2f} ms   p95 {p95:8.2f} ms")
+            for line in explain(connection, statement):
+                print(f"    {line}")
+
+
+def run(database_url, rows, repeats):
+    engine = create_engine(database_url)
+    start = time.perf_counter()
+    seed(engine, rows)
+    print(f"seeded {rows} properties in {time.perf_counter() - start:.1f}s ({engine.url.render_as_string(hide_password=True)})")
+
+    for index in secondary_indexes():
+        index.drop(engine)
+    report(engine, "without search indexes", repeats)
+
+    for index in secondary_indexes():
+        index.create(engine)
+    report(engine, "with search indexes", repeats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search index query-plan benchmark")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL",
+                        "sqlite:///" + os.path.join(tempfile.gettempdir(), "investr_bench.db")))
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+    run(args.database_url, args.rows, args.repeats)
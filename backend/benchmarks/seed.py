@@ -0,0 +1,73 @@
+# backend/benchmarks/seed.py
+# Synthetic listings, users and favourites for the database benchmarks, inserted
+# in chunks with executemany. Distributions loosely follow the London CSV.
+import random
+
+from models import Favorite, Property, User
+from utils import property_location_columns
+
+LOCATIONS = ["North London", "South London", "East London", "West London", "Central London"]
+PROPERTY_TYPES = ["Flat", "House", "Terraced", "Detached", "Semi-Detached", "Bungalow"]
+POSTCODES = {
+    "North London": ["N1", "N7", "N16", "NW1", "NW3", "NW6"],
+    "South London": ["SE1", "SE15", "SW2", "SW4", "SW11", "SW19"],
+    "East London": ["E1", "E2", "E8", "E14", "E17"],
+    "West London": ["W2", "W4", "W8", "W11", "W12"],
+    "Central London": ["WC1", "WC2", "EC1", "EC2", "EC4"],
+}
+WORDS = ["garden", "balcony", "period", "refurbished", "spacious", "quiet", "modern",
+         "parking", "terrace", "views", "loft", "garage", "conservatory", "station"]
+
+
+def synthetic_properties(n, seed=42):
+    rng = random.Random(seed)
+    for i in range(n):
+        location = rng.choice(LOCATIONS)
+        bedrooms = min(1 + int(rng.expovariate(0.6)), 8)
+        property_type = rng.choice(PROPERTY_TYPES)
+        price = int(round(rng.lognormvariate(13.4, 0.55) * (0.7 + 0.15 * bedrooms), -3))
+        postcode = rng.choice(POSTCODES[location])
+        title = f"{bedrooms} bedroom {property_type.lower()} for sale in {location}, {postcode}"
+        yield {
+            "title": title,
+            "price": max(price, 50_000),
+            "location": location,
+            "bedrooms": bedrooms,
+            "bathrooms": max(1, bedrooms - rng.randint(0, 2)),
+            "property_type": property_type,
+            "description": " ".join(rng.choices(WORDS, k=12)),
+            "image_url": "/images/properties/defaultprop.jpg",
+            "created_by": "seed-user",
+            "source": "dataset",
+            **property_location_columns(title, location),
+        }
+
+
+def insert_chunks(connection, table, rows, chunk_size=10_000):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            connection.execute(table.insert(), chunk)
+            chunk = []
+    if chunk:
+        connection.execute(table.insert(), chunk)
+
+
+def seed(engine, n_properties, n_users=2_000, favourites_per_user=10, seed=42):
+    """Recreates the tables and fills them; only ever point this at a scratch database."""
+    metadata = Property.metadata
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    rng = random.Random(seed)
+
+    with engine.begin() as connection:
+        insert_chunks(connection, User.__table__,
+                      [{"firebase_uid": "seed-user", "email": "seed@example.com"}] +
+                      [{"firebase_uid": f"user-{u}", "email": f"user-{u}@example.com"} for u in range(n_users)])
+        insert_chunks(connection, Property.__table__, synthetic_properties(n_properties, seed))
+        insert_chunks(connection, Favorite.__table__, (
+            {"user_id": f"user-{u}", "property_id": property_id}
+            for u in range(n_users)
+            for property_id in rng.sample(range(1, n_properties + 1), min(favourites_per_user, n_properties))
+        ))
@@ -0,0 +1,150 @@
+# backend/benchmarks/serving.py
+# Load test of the production entry point (gunicorn -c gunicorn.conf.py wsgi:app)
+# against a local database: throughput and latency for each combination of worker
+# count and DB pool size. Clients request a mix of filtered property searches,
+# favourites lists and recommendations over keep-alive connections.
+# Run from the backend folder: python -m benchmarks.serving [--workers 1 2 4] [--pool-sizes 1 4]
+# Uses a scratch SQLite file unless BENCH_DATABASE_URL points at a scratch PostgreSQL.
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL",
+                                       "sqlite:///" + os.path.join(tempfile.gettempdir(), "investr_serving.db"))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from benchmarks.seed import seed
+from extensions import db
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+N_USERS = 200
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)] if ordered else 0.0
+
+
+def request_mix(rng, tokens):
+    # 50% property searches, 30% favourites lists, 20% recommendations
+    roll = rng.random()
+    if roll < 0.5:
+        params = f"min_price={rng.randrange(100_000, 1_500_000, 10_000)}&min_bedrooms={rng.randint(1, 4)}&limit=20"
+        return "GET", f"/api/properties?{params}", None, {}
+    if roll < 0.8:
+        return "GET", "/api/favourites", None, {"Authorization": "Bearer " + rng.choice(tokens)}
+    body = json.dumps({"price": rng.randrange(200_000, 2_000_000, 5_000),
+                       "bedrooms": rng.randint(1, 5), "bathrooms": rng.randint(1, 3)})
+    return "POST", "/api/recommend", body, {"Content-Type": "application/json"}
+
+
+def start_server(port, workers, threads, pool_size, **env_overrides):
+    env = dict(os.environ, BIND=f"127.0.0.1:{port}", WEB_CONCURRENCY=str(workers),
+               GUNICORN_THREADS=str(threads), DB_POOL_SIZE=str(pool_size), DB_MAX_OVERFLOW="0",
+               AUTH_BACKEND="stub", **env_overrides)
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+                              cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("GET", "/api/properties?limit=1")
+            if connection.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("gunicorn did not start")
+
+
+def drive(port, concurrency, duration, tokens):
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(n):
+        rng = random.Random(n)
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        mine, failed = [], 0
+        while time.perf_counter() < stop_at:
+            method, path, body, headers = request_mix(rng, tokens)
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def run(workers_list, pool_sizes, threads, concurrency, duration, n_properties, port, json_path):
+    app = create_app()
+    with app.app_context():
+        seed(db.engine, n_properties, n_users=N_USERS, favourites_per_user=20)
+        tokens = [create_access_token(identity=f"user-{u}") for u in range(N_USERS)]
+
+    results = []
+    print(f"{n_properties} properties, {concurrency} clients, {threads} threads per worker, {duration}s per run")
+    print(f"{'workers':>7} {'pool':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    for workers in workers_list:
+        for pool_size in pool_sizes:
+            server = start_server(port, workers, threads, pool_size)
+            try:
+                drive(port, concurrency, min(duration, 2), tokens)  # warm-up
+                latencies, errors = drive(port, concurrency, duration, tokens)
+            finally:
+                server.terminate()
+                server.wait()
+            row = {"workers": workers, "pool_size": pool_size, "threads": threads,
+                   "requests_per_s": len(latencies) / duration,
+                   "p50_ms": percentile(latencies, 0.50) * 1000,
+                   "p95_ms": percentile(latencies, 0.95) * 1000,
+                   "p99_ms": percentile(latencies, 0.99) * 1000,
+                   "errors": errors}
+            results.append(row)
+            print(f"{workers:>7} {pool_size:>5} {row['requests_per_s']:>8.1f} {row['p50_ms']:>6.1f}ms "
+                  f"{row['p95_ms']:>6.1f}ms {row['p99_ms']:>6.1f}ms {errors:>7}")
+
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of the gunicorn entry point by worker count and pool size")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument("--concurrency", type=int, default=16, help="client connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per combination")
+    parser.add_argument("--properties", type=int, default=20_000)
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    run(args.workers, args.pool_sizes, args.threads, args.concurrency, args.duration,
+        args.properties, args.port, args.json)
@@ -0,0 +1,118 @@
+# backend/benchmarks/similar_properties.py
+# GET /api/properties/<id>/similar against 1M synthetic listings (benchmarks/seed.py).
+# Reports how long the index takes to build from the database, then the latency of
+# the nearest-neighbour query on its own and of the whole request through the test
+# client (new ids each time, so nothing is answered from a 304), next to an exact
+# NumPy scan over every listing, which is what a request would cost without the
+# tree. Ends with the cost of the incremental updates, and of querying once
+# MIN_REBUILD listings have been added and deleted beside the tree.
+# Run from the backend folder: python -m benchmarks.similar_properties [--properties 1000000]
+# Uses a scratch SQLite file (kept and reused) unless BENCH_DATABASE_URL points at a
+# scratch PostgreSQL.
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+
+import numpy as np
+from sqlalchemy import func, select
+
+import similarity
+from app import create_app
+from benchmarks.seed import seed
+from extensions import db
+from models import Property
+
+
+def timings(call, args):
+    seconds = []
+    for arg in args:
+        start = time.perf_counter()
+        call(arg)
+        seconds.append(time.perf_counter() - start)
+    seconds.sort()
+    return (statistics.median(seconds), seconds[max(int(len(seconds) * 0.95) - 1, 0)],
+            seconds[max(int(len(seconds) * 0.99) - 1, 0)])
+
+
+def report(name, p50, p95, p99=None):
+    print(f"  {name:50s} p50 {p50 * 1000:8.2f}ms  p95 {p95 * 1000:8.2f}ms" +
+          (f"  p99 {p99 * 1000:8.2f}ms" if p99 is not None else ""))
+
+
+def prepare(n_properties, reseed):
+    if not reseed:
+        try:
+            if db.session.scalar(select(func.count()).select_from(Property.__table__)) == n_properties:
+                db.session.execute(select(*similarity.LISTING_COLUMNS).limit(1)).all()
+                return
+        except Exception:
+            db.session.rollback()
+    start = time.perf_counter()
+    seed(db.engine, n_properties, n_users=0, favourites_per_user=0)
+    print(f"seeded {n_properties:,} listings in {time.perf_counter() - start:.0f}s")
+
+
+def run(n_properties, n_queries, k, reseed):
+    os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", "sqlite:///" + os.path.join(
+        tempfile.gettempdir(), f"investr_similar_{n_properties}.db"))
+    app = create_app()
+    client = app.test_client()
+    rng = random.Random(7)
+    with app.app_context():
+        prepare(n_properties, reseed)
+        db.session.remove()
+
+        start = time.perf_counter()
+        index = similarity.get_similarity_index()
+        build = time.perf_counter() - start
+        data = index.tree.get_arrays()[0] if index.tree is not None else np.empty(0)
+        print(f"\n{len(index.ids):,} listings ({db.engine.dialect.name}), k={k}")
+        print(f"  index built from the database in {build:.1f}s, "
+              f"{(data.nbytes + index.ids.nbytes) / 2 ** 20:.0f} MB of vectors and ids")
+
+        ids = [int(index.ids[rng.randrange(len(index.ids))]) for _ in range(n_queries)]
+        targets = {p.id: p for p in Property.query.filter(Property.id.in_(ids))}
+        vectors = {i: similarity.listing_vectors([targets[i]])[0] for i in ids}
+
+        report("KDTree query", *timings(lambda i: index.query(vectors[i], k, exclude=i), ids))
+        report("GET /api/properties/<id>/similar", *timings(
+            lambda i: client.get(f"/api/properties/{i}/similar?k={k}"), ids))
+
+        # Exact answer by scanning every vector: what each request would do without a tree
+        def scan(i):
+            distances = np.sqrt(((data - index.standardize(vectors[i])) ** 2).sum(axis=1))
+            return np.argpartition(distances, k + 1)[:k + 1]
+
+        report("NumPy scan over every listing", *timings(scan, ids[:max(n_queries // 20, 5)]))
+
+        # The tree must agree with the scan (up to ties between identical listings)
+        for i in ids[:20]:
+            found = index.query(vectors[i], k, exclude=i)
+            distances = np.sort(np.sqrt(((data - index.standardize(vectors[i])) ** 2).sum(axis=1)))
+            assert np.allclose([d for _, d in found], distances[1:k + 1]), i
+
+        # Incremental updates, as made by POST and DELETE /api/properties
+        new_ids = list(range(index.max_id + 1, index.max_id + 1 + similarity.MIN_REBUILD))
+        rows = [targets[rng.choice(ids)] for _ in new_ids]
+        added = timings(lambda n: index.add([new_ids[n]], similarity.listing_vectors([rows[n]])),
+                        range(len(new_ids)))
+        removed = timings(lambda n: index.remove([ids[n]]), range(min(len(ids), similarity.MIN_REBUILD)))
+        report(f"add one listing (up to {len(new_ids):,} beside the tree)", *added[:2])
+        report("delete one listing", *removed[:2])
+        report(f"KDTree query, {len(new_ids):,} added and deleted beside it",
+               *timings(lambda i: index.query(vectors[i], k, exclude=i), ids))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Similar-properties index build and query latency")
+    parser.add_argument("--properties", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--reseed", action="store_true", help="rebuild the seeded database")
+    args = parser.parse_args()
+    run(args.properties, args.queries, args.k, args.reseed)
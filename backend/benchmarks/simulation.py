@@ -0,0 +1,74 @@
+# backend/benchmarks/simulation.py
+# Checks the vectorized amortization against a plain month-by-month loop (with
+# rate resets and a zero-rate stretch), then times the Monte Carlo mode.
+# Run from the backend folder: python -m benchmarks.simulation [--paths 10000 --years 30]
+import argparse
+import time
+
+import numpy as np
+
+from simulation import amortize, monte_carlo
+
+
+def loop_schedule(loan, annual_rates, term_months):
+    # Reference: recompute the payment over the remaining term every month
+    balance, balances, payments = loan, [], []
+    for month, annual_rate in enumerate(annual_rates):
+        r, n = annual_rate / 12, term_months - month
+        if n <= 0:
+            payment = 0.0
+        elif r == 0:
+            payment = balance / n
+        else:
+            payment = balance * r / (1 - (1 + r) ** -n)
+        balance = balance * (1 + r) - payment
+        balances.append(max(balance, 0.0))
+        payments.append(payment)
+    return np.array(balances), np.array(payments)
+
+
+def check_parity(loan=300_000, term_years=25, horizon_years=30, seed=0):
+    rng = np.random.default_rng(seed)
+    rates = np.repeat(rng.uniform(0, 0.08, horizon_years), 12)
+    rates[:24] = 0
+    expected_balance, expected_payments = loop_schedule(loan, rates, term_years * 12)
+
+    balance, payments, _ = amortize(loan, rates, term_years * 12)
+    yearly_balance, yearly_payments, _ = amortize(loan, rates[::12], term_years * 12, step_months=12)
+
+    errors = {
+        "monthly balance": np.abs(balance - expected_balance).max(),
+        "monthly payments": np.abs(payments - expected_payments).max(),
+        "yearly balance": np.abs(yearly_balance - expected_balance[11::12]).max(),
+        "yearly payments": np.abs(yearly_payments - expected_payments.reshape(-1, 12).sum(axis=1)).max(),
+    }
+    for name, error in errors.items():
+        print(f"max abs error, {name}: £{error:.2e}")
+    ok = max(errors.values()) < 0.01
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+def time_monte_carlo(paths, years, repeat):
+    args = (250_000, 50_000, 0.05, 1_200, 0.03, years, 25, paths)
+    monte_carlo(*args)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        bands = monte_carlo(*args)
+        timings.append(time.perf_counter() - start)
+    print(f"monte carlo {paths:,} paths x {years} years: "
+          f"best {min(timings) * 1000:.1f} ms, median {np.median(timings) * 1000:.1f} ms")
+    print(f"year {years} equity P10/P50/P90: "
+          + " / ".join(f"£{bands['equity'][p][-1]:,.0f}" for p in ("p10", "p50", "p90")))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Amortization parity and Monte Carlo timing")
+    parser.add_argument("--paths", type=int, default=10_000)
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    ok = check_parity()
+    time_monte_carlo(args.paths, args.years, args.repeat)
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,84 @@
+# backend/benchmarks/startup.py
+# Import time of the app (python -X importtime) and time to the first request,
+# each measured in a fresh interpreter so nothing is cached between runs.
+# Run from the backend folder: python -m benchmarks.startup [--json results.json]
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+FIRST_REQUEST = """
+import time
+start = time.perf_counter()
+from app import create_app
+app = create_app()
+imported = time.perf_counter()
+client = app.test_client()
+client.get('/')
+first = time.perf_counter()
+client.post('/api/recommend', json={"price": 450000, "bedrooms": 2, "bathrooms": 1})
+recommend = time.perf_counter()
+print(f"{imported - start} {first - imported} {recommend - first}")
+"""
+
+
+def child_env():
+    return dict(os.environ,
+                DATABASE_URL=os.getenv("DATABASE_URL", "sqlite://"),
+                JWT_SECRET_KEY=os.getenv("JWT_SECRET_KEY", "benchmark-secret"))
+
+
+def import_times(module):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            env=child_env(), capture_output=True, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(cumulative_us), len(indent)))
+    total = next(cumulative for name, cumulative, _ in modules if name == module)
+    # Third-party packages imported directly by our modules, by cumulative cost
+    top_level = sorted(((n, c) for n, c, depth in modules if depth <= 3 and n != module),
+                       key=lambda item: item[1], reverse=True)
+    return total, top_level[:10]
+
+
+def first_request_times():
+    result = subprocess.run([sys.executable, "-c", FIRST_REQUEST],
+                            env=child_env(), capture_output=True, text=True, check=True)
+    imported, first, recommend = map(float, result.stdout.strip().splitlines()[-1].split())
+    return imported, first, recommend
+
+
+def run(json_path=None):
+    total, heaviest = import_times("app")
+    imported, first, recommend = first_request_times()
+
+    print(f"import app (importtime):      {total / 1000:8.1f} ms")
+    for name, cumulative in heaviest:
+        print(f"    {name:32s} {cumulative / 1000:8.1f} ms")
+    print(f"import app (wall clock):      {imported * 1000:8.1f} ms")
+    print(f"first request (GET /):        {first * 1000:8.1f} ms")
+    print(f"first POST /api/recommend:    {recommend * 1000:8.1f} ms  (includes the lazy model load)")
+
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump({
+                "import_app_ms": total / 1000,
+                "heaviest_imports_ms": {name: cumulative / 1000 for name, cumulative in heaviest},
+                "import_wall_ms": imported * 1000,
+                "first_request_ms": first * 1000,
+                "first_recommend_ms": recommend * 1000,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="App import time and time to first request")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    run(args.json)
@@ -0,0 +1,67 @@
+# backend/benchmarks/streaming_json.py
+# Peak RSS and time-to-first-byte of GET /api/properties, buffered (query.all +
+# jsonify) versus ?stream=1, at 10k and 100k matching rows. Every measurement runs
+# in a fresh process so peak RSS isn't inherited from the previous one.
+# Run from the backend folder: python -m benchmarks.streaming_json
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+
+
+def child(mode):
+    # DATABASE_URL is set by the parent before the app is imported
+    from app import create_app
+    app = create_app()
+
+    client = app.test_client()
+    url = '/api/properties?stream=1' if mode == 'stream' else '/api/properties'
+    start = time.perf_counter()
+    response = client.get(url, buffered=False)
+    chunks = iter(response.response)
+    first = next(chunks)
+    ttfb = time.perf_counter() - start
+    size = len(first)
+    for chunk in chunks:
+        size += len(chunk)
+    total = time.perf_counter() - start
+    response.close()
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{ttfb * 1000:.1f} {total * 1000:.1f} {peak_kb / 1024:.1f} {size}")
+
+
+def measure(database_url, mode):
+    env = dict(os.environ, DATABASE_URL=database_url, JWT_SECRET_KEY=os.getenv("JWT_SECRET_KEY", "benchmark-secret"))
+    result = subprocess.run([sys.executable, "-m", "benchmarks.streaming_json", "--child", mode],
+                            env=env, capture_output=True, text=True, check=True)
+    ttfb, total, peak, size = result.stdout.strip().splitlines()[-1].split()
+    return float(ttfb), float(total), float(peak), int(size)
+
+
+def run(sizes):
+    from benchmarks.seed import seed
+
+    for rows in sizes:
+        path = os.path.join(tempfile.gettempdir(), f"investr_stream_{rows}.db")
+        database_url = "sqlite:///" + path
+        seed(create_engine(database_url), rows, n_users=1, favourites_per_user=0)
+        print(f"\n{rows} rows")
+        for mode in ("buffered", "stream"):
+            ttfb, total, peak, size = measure(database_url, mode)
+            print(f"  {mode:9s} ttfb {ttfb:9.1f} ms   total {total:9.1f} ms   peak RSS {peak:8.1f} MB   body {size / 1e6:6.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Buffered vs streamed property listings")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--child", choices=["buffered", "stream"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+    else:
+        run(args.rows)
@@ -0,0 +1,147 @@
+# backend/benchmarks/text_search.py
+# GET /api/properties?q= against 100k listings whose titles and descriptions are
+# the real ones from the London CSV (repeated, with varied prices and bedrooms), so
+# words are as common as they are in the data: "garden" is in ~65% of listings,
+# "hampstead" in ~10%. Each search is timed through the test client with the
+# response cache off, and the statements it runs are timed on their own (rows
+# fetched included), next to the LIKE '%word%' scan it replaces, which can only
+# filter, not rank.
+# Run from the backend folder: python -m benchmarks.text_search [--properties 100000]
+# Uses a scratch SQLite file unless BENCH_DATABASE_URL points at a scratch PostgreSQL.
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL",
+                                       "sqlite:///" + os.path.join(tempfile.gettempdir(), "investr_text_search.db"))
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+os.environ["PROPERTY_CACHE_MAX_ENTRIES"] = "0"
+
+import pandas as pd
+from sqlalchemy import and_, event, or_
+
+from app import create_app
+from benchmarks.seed import insert_chunks, seed
+from extensions import db
+from ingest_listings import CSV_COLUMNS, DEFAULT_CSV, clean_chunk
+from models import Property
+
+SEARCHES = [
+    ("hampstead", {}),
+    ("garden", {}),
+    ("garden balcony", {}),
+    ("period conservatory", {"min_price": 500_000, "min_bedrooms": 3}),
+    ("penthouse", {"sort": "price"}),
+    ("garden", {"sort": "price"}),
+    ("river views", {"location": "West London", "max_price": 2_000_000}),
+]
+
+
+def listings(n, seed=42):
+    rows = clean_chunk(pd.read_csv(DEFAULT_CSV, usecols=CSV_COLUMNS, encoding='utf-8-sig')).to_dict('records')
+    rng = random.Random(seed)
+    for i in range(n):
+        row = dict(rows[i % len(rows)])
+        row.pop('external_id')
+        row['price'] = int(row['price'] * rng.uniform(0.7, 1.3))
+        row['bedrooms'] = max(1, row['bedrooms'] + rng.randint(-1, 1))
+        row['location'] = rng.choice(["North London", "South London", "East London", "West London", "Central London"])
+        yield row
+
+
+def like_scan(words, params):
+    # What a q= search would cost without the text index
+    filters = [or_(Property.title.ilike(f"%{word}%"), Property.description.ilike(f"%{word}%")) for word in words.split()]
+    if "min_price" in params:
+        filters.append(Property.price >= params["min_price"])
+    if "max_price" in params:
+        filters.append(Property.price <= params["max_price"])
+    if "min_bedrooms" in params:
+        filters.append(Property.bedrooms >= params["min_bedrooms"])
+    if "location" in params:
+        filters.append(Property.location == params["location"])
+    return Property.query.filter(and_(*filters)).order_by(Property.price, Property.id).limit(20).all()
+
+
+def statements(engine, call):
+    # The statements call() runs, with their parameters
+    issued = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        issued.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return issued
+
+
+def run_statements(issued):
+    # Straight through the driver: SQLite does most of a query's work while rows
+    # are fetched, which the engine's execute events don't see
+    with db.engine.connect() as connection:
+        cursor = connection.connection.cursor()
+        for statement, parameters in issued:
+            cursor.execute(statement, parameters)
+            cursor.fetchall()
+
+
+def timed(call, repeat):
+    call()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return statistics.median(timings), timings[max(int(len(timings) * 0.95) - 1, 0)]
+
+
+def run(n_properties, repeat, like_repeat):
+    app = create_app()
+    client = app.test_client()
+    with app.app_context():
+        start = time.perf_counter()
+        seed(db.engine, 0, n_users=0, favourites_per_user=0)
+        with db.engine.begin() as connection:
+            insert_chunks(connection, Property.__table__, (
+                dict(row, image_url="/images/properties/defaultprop.jpg", created_by="seed-user", source="dataset")
+                for row in listings(n_properties)))
+            if connection.dialect.name == 'postgresql':
+                # Autovacuum would have by the time anyone searches; until then the
+                # planner has no idea how common a word is (nothing analyzes SQLite)
+                connection.exec_driver_sql("ANALYZE properties")
+        print(f"{n_properties:,} listings inserted and indexed in {time.perf_counter() - start:.0f}s "
+              f"({db.engine.dialect.name})")
+
+        print(f"{'search':66s} {'matches':>8} {'request p50':>12} {'p95':>9} {'SQL p50':>9} {'LIKE p50':>9}")
+        for words, params in SEARCHES:
+            query = "&".join([f"q={words.replace(' ', '+')}", "limit=20"] +
+                             [f"{name}={str(value).replace(' ', '+')}" for name, value in params.items()])
+            url = f"/api/properties?{query}"
+            response = client.get(url)
+            assert response.status_code == 200, response.get_json()
+
+            # Relevance only ranks the newest matches; count them all in price order
+            count_url = url.replace("limit=20", "fields=id") + ("" if "sort" in params else "&sort=price")
+            matches = len(client.get(count_url).get_json())
+            p50, p95 = timed(lambda: client.get(url), repeat)
+            issued = statements(db.engine, lambda: client.get(url))
+            sql_p50, _ = timed(lambda: run_statements(issued), repeat)
+            like_p50, _ = timed(lambda: like_scan(words, params), like_repeat)
+            print(f"{query:66s} {matches:>8,} {p50 * 1000:>10.2f}ms {p95 * 1000:>7.2f}ms {sql_p50 * 1000:>7.2f}ms "
+                  f"{like_p50 * 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full-text search latency")
+    parser.add_argument("--properties", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--like-repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.properties, args.repeat, args.like_repeat)
@@ -0,0 +1,90 @@
+# backend/benchmarks/worker_memory.py
+# Resident memory per worker process with 1, 4 and 16 workers, for three ways of
+# holding the recommendation model:
+#   pickle    RECOMMENDER_BACKEND=sklearn, every worker unpickles the estimator
+#   compiled  every worker unpickles and compiles its own copy (the old default)
+#   mmap      every worker memory-maps the shared .npy artifact (the new default)
+# Each worker is a fresh interpreter that imports the app and serves a few
+# /api/recommend calls, like a worker started without preloading. RSS counts shared
+# pages in every process; USS is memory only that process holds, and PSS splits
+# shared pages between the processes using them (Linux only).
+# Run from the backend folder: python -m benchmarks.worker_memory [--workers 1 4 16]
+import argparse
+import os
+import subprocess
+import sys
+
+import psutil
+
+WORKER = """
+import os, sys
+import recomendation
+mode = sys.argv[1]
+if mode == "compiled":
+    from compiled_model import compile_model
+    recomendation._compiled_model = compile_model(recomendation.get_model())
+from app import create_app
+app = create_app()
+recomendation.warm_up()
+client = app.test_client()
+for i in range(20):
+    client.post('/api/recommend', json={"price": 300000 + i * 25000, "bedrooms": 2 + i % 3, "bathrooms": 1})
+print("ready", flush=True)
+sys.stdin.read()
+"""
+
+MODES = {
+    "pickle": {"RECOMMENDER_BACKEND": "sklearn"},
+    "compiled": {"RECOMMENDER_BACKEND": "compiled"},
+    "mmap": {"RECOMMENDER_BACKEND": "compiled"},
+}
+
+MB = 2 ** 20
+
+
+def child_env(mode):
+    return dict(os.environ,
+                DATABASE_URL=os.getenv("DATABASE_URL", "sqlite://"),
+                JWT_SECRET_KEY=os.getenv("JWT_SECRET_KEY", "benchmark-secret"),
+                **MODES[mode])
+
+
+def measure(mode, n_workers):
+    workers = [subprocess.Popen([sys.executable, "-c", WORKER, mode], env=child_env(mode),
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+               for _ in range(n_workers)]
+    try:
+        for worker in workers:
+            line = worker.stdout.readline()
+            if line.strip() != "ready":
+                raise RuntimeError(f"{mode} worker failed to start")
+        info = [psutil.Process(worker.pid).memory_full_info() for worker in workers]
+    finally:
+        for worker in workers:
+            worker.stdin.close()
+            worker.wait()
+
+    rss = sum(i.rss for i in info) / n_workers / MB
+    uss = sum(i.uss for i in info) / n_workers / MB
+    pss = sum(getattr(i, "pss", i.rss) for i in info) / MB
+    return rss, uss, pss
+
+
+def run(worker_counts, modes):
+    # Make sure the artifact exists before the mmap workers start
+    from recomendation import build_compiled_model
+    build_compiled_model()
+
+    print(f"{'mode':>9} {'workers':>8} {'RSS/worker':>11} {'USS/worker':>11} {'PSS total':>10} {'PSS/worker':>11}")
+    for mode in modes:
+        for n in worker_counts:
+            rss, uss, pss = measure(mode, n)
+            print(f"{mode:>9} {n:>8} {rss:>9.1f}MB {uss:>9.1f}MB {pss:>8.1f}MB {pss / n:>9.1f}MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident memory per worker for each model format")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    args = parser.parse_args()
+    run(args.workers, args.modes)
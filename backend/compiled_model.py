@@ -0,0 +1,198 @@
+# backend/compiled_model.py
+# Flattens the calibrated gradient-boosting ensemble into contiguous NumPy arrays
+# so a whole batch can be pushed through every tree at once, without sklearn's
+# per-call validation overhead.
+#
+# The arrays can be saved as plain .npy files and memory-mapped back (read-only),
+# so pre-forked workers share one copy of the model in the page cache, and a
+# worker that only serves the compiled model never imports sklearn or scipy.
+import json
+import os
+import shutil
+import tempfile
+import warnings
+import numpy as np
+
+# Rows walked together; keeps the (rows x trees) index arrays cache sized
+CHUNK_ROWS = 64
+
+# Saved as <name>.npy in the artifact directory; depth and n_features_in_ go in meta.json
+ARRAYS = ("feature", "threshold", "left", "value", "roots", "fold_offsets", "fold_bias", "classes_")
+
+
+def _expit(x):
+    # Logistic sigmoid without scipy.special; the tanh form can't overflow
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+class CompiledModel:
+    """Array-backed stand-in for the pickled CalibratedClassifierCV.
+
+    Every tree of every calibrated fold lives in the same node arrays, laid out
+    so that a node's right child directly follows its left child. Leaves point
+    at themselves with an infinite threshold, so a fixed number of steps (the
+    deepest tree) lands every row on a leaf. Each fold's learning rate and
+    sigmoid calibrator are folded into its leaf values and a per-fold bias, so
+    the calibrated probability of a fold is expit(bias + sum of its leaves).
+    """
+
+    def __init__(self, feature, threshold, left, value, roots, fold_offsets, fold_bias, depth, classes, n_features_in):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.value = value
+        self.roots = roots
+        self.fold_offsets = fold_offsets
+        self.fold_bias = fold_bias
+        self.depth = depth
+        self.classes_ = classes
+        self.n_features_in_ = n_features_in
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def _leaf_values(self, X):
+        flat = X.ravel()
+        row_start = (np.arange(X.shape[0]) * X.shape[1])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+        for _ in range(self.depth):
+            go_right = flat[row_start + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.left[nodes] + go_right
+        return self.value[nodes]
+
+    def predict_proba(self, X):
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected an array of shape (n_samples, {self.n_features_in_})")
+
+        fold_scores = np.empty((X.shape[0], len(self.fold_offsets)))
+        for start in range(0, X.shape[0], CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            fold_scores[start:start + CHUNK_ROWS] = np.add.reduceat(self._leaf_values(chunk), self.fold_offsets, axis=1)
+        positive = _expit(fold_scores + self.fold_bias).mean(axis=1)
+
+        proba = np.empty((X.shape[0], 2))
+        proba[:, 1] = positive
+        proba[:, 0] = 1.0 - positive
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def _sibling_order(tree):
+    # Breadth-first node order in which every right child sits right after its left sibling
+    order = [0]
+    for node in order:
+        if tree.children_left[node] != -1:
+            order.extend((tree.children_left[node], tree.children_right[node]))
+    return np.asarray(order, dtype=np.intp)
+
+
+def compile_model(model):
+    """Compiles a binary CalibratedClassifierCV(GradientBoostingClassifier, method='sigmoid')."""
+    if len(model.classes_) != 2:
+        raise ValueError("Only binary classifiers can be compiled")
+
+    feature, threshold, left, value = [], [], [], []
+    roots, fold_offsets, fold_bias = [], [], []
+    depth = 0
+    n_nodes = 0
+
+    for calibrated in model.calibrated_classifiers_:
+        estimator = calibrated.estimator
+        calibrator = calibrated.calibrators[0]
+        if not hasattr(calibrator, "a_"):
+            raise ValueError("Only sigmoid calibration can be folded into the compiled model")
+
+        # Raw score of the init estimator: decision_function minus the tree contributions
+        probe = np.zeros((1, estimator.n_features_in_), dtype=np.float32)
+        trees = [tree for tree in estimator.estimators_[:, 0]]
+        tree_sum = sum(tree.predict(probe)[0] for tree in trees)
+        with warnings.catch_warnings():
+            # The probe is a bare array, the ensemble was fitted on a named DataFrame
+            warnings.simplefilter("ignore", UserWarning)
+            init_raw = estimator.decision_function(probe)[0] - estimator.learning_rate * tree_sum
+
+        # expit(-(a * (init + lr * sum(leaves)) + b)) == expit(bias + sum(scale * leaves))
+        scale = -calibrator.a_ * estimator.learning_rate
+        fold_offsets.append(len(roots))
+        fold_bias.append(-(calibrator.a_ * init_raw + calibrator.b_))
+
+        for tree in trees:
+            t = tree.tree_
+            order = _sibling_order(t)
+            new_id = np.empty(t.node_count, dtype=np.intp)
+            new_id[order] = np.arange(t.node_count) + n_nodes
+
+            children_left = t.children_left[order]
+            is_leaf = children_left == -1
+            roots.append(n_nodes)
+            feature.append(np.where(is_leaf, 0, t.feature[order]))
+            threshold.append(np.where(is_leaf, np.inf, t.threshold[order]))
+            left.append(np.where(is_leaf, new_id[order], new_id[children_left]))
+            value.append(np.where(is_leaf, t.value[order, 0, 0] * scale, 0.0))
+            depth = max(depth, t.max_depth)
+            n_nodes += t.node_count
+
+    return CompiledModel(
+        feature=np.concatenate(feature).astype(np.intp),
+        threshold=np.concatenate(threshold).astype(np.float64),
+        left=np.concatenate(left).astype(np.intp),
+        value=np.concatenate(value).astype(np.float64),
+        roots=np.asarray(roots, dtype=np.intp),
+        fold_offsets=np.asarray(fold_offsets, dtype=np.intp),
+        fold_bias=np.asarray(fold_bias, dtype=np.float64),
+        depth=depth,
+        classes=np.asarray(model.classes_),
+        n_features_in=model.n_features_in_,
+    )
+
+
+def save_compiled_model(model, directory, **meta):
+    """Writes model's arrays as .npy files, plus meta.json, to a new directory.
+
+    Files are written to a temporary directory next to it and renamed into place, so
+    concurrent workers never see half an artifact; if another process got there
+    first, its copy is kept.
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".compiling-", dir=parent)
+    try:
+        for name in ARRAYS:
+            np.save(os.path.join(tmp, name + ".npy"), getattr(model, name), allow_pickle=False)
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump({**meta, "depth": int(model.depth), "n_features_in": int(model.n_features_in_)}, f)
+        os.rename(tmp, directory)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.isfile(os.path.join(directory, "meta.json")):
+            raise
+
+
+def load_compiled_model(directory, mmap_mode="r"):
+    """Loads an artifact written by save_compiled_model.
+
+    With mmap_mode='r' the arrays are read-only views of the files: every process
+    that loads the same artifact shares the same physical pages, and nothing can
+    write to them by accident.
+    """
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    arrays = {name: np.asarray(np.load(os.path.join(directory, name + ".npy"), mmap_mode=mmap_mode, allow_pickle=False))
+              for name in ARRAYS}
+    return CompiledModel(
+        feature=arrays["feature"],
+        threshold=arrays["threshold"],
+        left=arrays["left"],
+        value=arrays["value"],
+        roots=arrays["roots"],
+        fold_offsets=arrays["fold_offsets"],
+        fold_bias=arrays["fold_bias"],
+        depth=meta["depth"],
+        classes=arrays["classes_"],
+        n_features_in=meta["n_features_in"],
+    )
@@ -1,6 +1,9 @@
 # run this file to create database
 
-from app import app, db
+from app import create_app
+from extensions import db
+
+app = create_app()
 
 with app.app_context():
     db.create_all()
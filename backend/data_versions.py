@@ -0,0 +1,34 @@
+# backend/data_versions.py
+# Version counters behind the conditional GET support: a reader needs one primary
+# key lookup to know whether anything it serves has changed.
+from datetime import datetime
+
+from sqlalchemy import select
+
+from extensions import db, conflict_insert
+from models import DataVersion
+
+PROPERTIES = 'properties'
+
+
+def favourites_key(user_id):
+    return f'favourites:{user_id}'
+
+
+def bump_data_version(name):
+    # Runs in the caller's transaction, so the bump commits or rolls back with the write
+    now = datetime.utcnow().replace(microsecond=0)
+    statement = conflict_insert(DataVersion.__table__).values(name=name, version=1, updated_at=now)
+    statement = statement.on_conflict_do_update(
+        index_elements=['name'],
+        set_={'version': DataVersion.__table__.c.version + 1, 'updated_at': now}
+    )
+    db.session.execute(statement)
+
+
+def get_data_version(name):
+    # (version, updated_at); (0, None) until the first write
+    row = db.session.execute(
+        select(DataVersion.version, DataVersion.updated_at).where(DataVersion.name == name)
+    ).first()
+    return (row.version, row.updated_at) if row else (0, None)
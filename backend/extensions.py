@@ -1,10 +1,25 @@
 #extensions.py
 from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
+from flask_jwt_extended import JWTManager
 
-# Instantiate the SQLAlchemy object
+# Instantiate the extensions; app.create_app binds them to each app
 db = SQLAlchemy()
+migrate = Migrate()
+jwt = JWTManager()
 
 
+def conflict_insert(table, dialect=None):
+    """INSERT for `table` that supports on_conflict_do_nothing/do_update.
 
-
-
+    PostgreSQL and SQLite both have ON CONFLICT, but SQLAlchemy exposes it
+    through each dialect's own insert().
+    """
+    dialect = dialect or db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"ON CONFLICT is not supported on {dialect}")
+    return insert(table)
@@ -1,10 +1,14 @@
 import os
+import hashlib
 import json
-import pyrebase
+import logging
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()  # Load environment variables from .env file
 
+logger = logging.getLogger(__name__)
+
 # Firebase config loaded securely from environment
 firebaseConfig = {
     "apiKey": os.getenv("REACT_APP_FIREBASE_API_KEY"),
@@ -17,9 +21,85 @@ firebaseConfig = {
     "measurementId": os.getenv("REACT_APP_FIREBASE_MEASUREMENT_ID")
 }
 
-# Initialize Firebase
-firebase = pyrebase.initialize_app(firebaseConfig)
-auth = firebase.auth()
+class FirebaseAuthBackend:
+    """Email/password auth against Firebase through pyrebase.
+
+    Both calls already return the account's localId, so one round trip is
+    enough; there is no need for a follow-up get_account_info.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._auth = None
+        self._lock = threading.Lock()
+
+    @property
+    def auth(self):
+        # Firebase is initialized on first use rather than at import
+        if self._auth is None:
+            with self._lock:
+                if self._auth is None:
+                    import pyrebase
+                    firebase = pyrebase.initialize_app(self.config)
+                    self._auth = firebase.auth()
+        return self._auth
+
+    def warm_up(self):
+        return self.auth
+
+    def create_user(self, email, password):
+        return self.auth.create_user_with_email_and_password(email, password)['localId']
+
+    def sign_in(self, email, password):
+        return self.auth.sign_in_with_email_and_password(email, password)['localId']
+
+
+class StubAuthBackend:
+    """Network-free backend for local runs and load tests.
+
+    Stateless, so every worker process agrees: the uid is derived from the
+    email, and any non-empty password is accepted unless STUB_AUTH_PASSWORD
+    is set, in which case it must match.
+    """
+
+    def __init__(self, password=None):
+        self.password = password
+
+    def warm_up(self):
+        pass
+
+    def _uid(self, email, password):
+        if self.password is not None and password != self.password:
+            raise ValueError("INVALID_PASSWORD")
+        return "stub-" + hashlib.sha1(email.lower().encode("utf-8")).hexdigest()[:28]
+
+    def create_user(self, email, password):
+        return self._uid(email, password)
+
+    def sign_in(self, email, password):
+        return self._uid(email, password)
+
+
+AUTH_BACKENDS = {
+    "firebase": lambda: FirebaseAuthBackend(firebaseConfig),
+    "stub": lambda: StubAuthBackend(os.getenv("STUB_AUTH_PASSWORD")),
+}
+
+_backend = None
+_lock = threading.Lock()
+
+def get_auth_backend():
+    # AUTH_BACKEND=stub swaps Firebase for the local stub
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                _backend = AUTH_BACKENDS[os.getenv("AUTH_BACKEND", "firebase")]()
+    return _backend
+
+def set_auth_backend(backend):
+    global _backend
+    _backend = backend
 
 def signup(email, password):
     email = email.strip()
@@ -29,14 +109,13 @@ def signup(email, password):
         raise ValueError("Email and password cannot be empty")
 
     try:
-        user = auth.create_user_with_email_and_password(email, password)
-        firebase_uid = auth.get_account_info(user['idToken'])['users'][0]['localId']
+        firebase_uid = get_auth_backend().create_user(email, password)
         return {
             "firebase_uid": firebase_uid,
             "email": email
         }
     except Exception as e:
-        print("Signup error:", str(e))
+        logger.warning("Signup error: %s", e)
         raise Exception("Registration failed. Check your email and password.")
 
 def login_user(email, password):
@@ -47,12 +126,11 @@ def login_user(email, password):
         raise ValueError("Email and password cannot be empty")
 
     try:
-        user = auth.sign_in_with_email_and_password(email, password)
-        firebase_uid = auth.get_account_info(user['idToken'])['users'][0]['localId']
+        firebase_uid = get_auth_backend().sign_in(email, password)
         return {
             "firebase_uid": firebase_uid,
             "email": email
         }
     except Exception as e:
-        print("Login error:", str(e))
+        logger.warning("Login error: %s", e)
         raise Exception("Login failed. Invalid email or password.")
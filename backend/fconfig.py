@@ -1,26 +1,50 @@
 #firebase configuration
-import firebase_admin
-from firebase_admin import credentials, firestore, auth
+import logging
 import os
+import threading
 from flask_jwt_extended import decode_token
 from flask_jwt_extended.exceptions import JWTDecodeError
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__)))
 SERVICE_ACCOUNT_PATH = os.path.join(BASE_DIR, "config", "serviceAccountKey.json")
 
-# Load Firebase credentials
-cred = credentials.Certificate(SERVICE_ACCOUNT_PATH)
-firebase_admin.initialize_app(cred)
+logger = logging.getLogger(__name__)
 
-# Firestore reference
-db = firestore.client()
+# The Admin SDK and Firestore client are created on first use, so importing this
+# module (and anything that imports routes) needs neither credentials nor network
+_firebase_app = None
+_firestore_client = None
+_lock = threading.Lock()
+
+def get_firebase_app():
+    global _firebase_app
+    if _firebase_app is None:
+        with _lock:
+            if _firebase_app is None:
+                import firebase_admin
+                from firebase_admin import credentials
+
+                # Load Firebase credentials
+                cred = credentials.Certificate(SERVICE_ACCOUNT_PATH)
+                _firebase_app = firebase_admin.initialize_app(cred)
+                logger.info("Firebase Admin SDK initialized")
+    return _firebase_app
+
+def get_firestore():
+    # Firestore reference
+    global _firestore_client
+    if _firestore_client is None:
+        firebase_app = get_firebase_app()
+        with _lock:
+            if _firestore_client is None:
+                from firebase_admin import firestore
+                _firestore_client = firestore.client(firebase_app)
+    return _firestore_client
 
 def verify_token(token):
     try:
         decoded = decode_token(token)
         return decoded
     except JWTDecodeError as e:
-        print("Token verification failed:", e)
+        logger.info("Token verification failed: %s", e)
         return None
-
-print("Firebase Admin SDK initialized successfully!")
@@ -0,0 +1,161 @@
+# backend/features.py
+# Feature engineering shared by training (models/recommendation_model.pkl.ipynb),
+# the API and offline scoring. Everything works on whole columns: pass a DataFrame,
+# or a dict of lists/arrays, and get back the model's FEATURES matrix.
+# pandas is only needed to clean raw exports and is imported there, so the API
+# doesn't pay for it at startup.
+import numpy as np
+
+from utils import REGION_MAP, TITLE_POSTCODE
+
+FEATURES = [
+    "price", "bedrooms", "bathrooms", "sizeSqFeetMax",
+    "price_per_bedroom", "price_per_sqft",
+    "estimated_rent", "rent_to_price_ratio", "bedrooms_per_100k", "region_score",
+    "region_Central", "region_East", "region_North", "region_Other",
+    "region_South", "region_West",
+    "propertyType_Detached", "propertyType_Flat", "propertyType_House",
+    "propertyType_Other", "propertyType_Semi_Detached", "propertyType_Terraced"
+]
+COLUMN = {name: i for i, name in enumerate(FEATURES)}
+
+PROPERTY_TYPES = ["Detached", "Flat", "House", "Semi_Detached", "Terraced", "Other"]
+REGIONS = ["North", "South", "East", "West", "Central", "Other"]
+
+# The values the model was trained with (serving used to send benchmark growth x 100)
+REGION_SCORES = {"Central": 0.90, "East": 0.85, "South": 0.75, "West": 0.65, "North": 0.60, "Other": 0.50}
+
+# Median floor area of the London dataset, used for listings without one. A fixed
+# value rather than each file's (or chunk's) median keeps scores reproducible.
+DEFAULT_SQFT = 3791.0
+
+# Listings carry no rent or growth figures, and the dataset has none to build lookup
+# tables from. The model was trained on uniform draws from these ranges, so each
+# property gets a fixed draw from the same ranges, seeded by a hash of its attributes.
+RENT_YIELD_RANGE = (0.0035, 0.0065)   # monthly rent / price
+GROWTH_RATE_RANGE = (0.02, 0.06)      # annual
+
+def normalize_property_types(values):
+    # "Semi-Detached" -> "Semi_Detached"; anything outside PROPERTY_TYPES (or missing) -> "Other"
+    types = np.asarray(values, dtype=str)
+    if types.size:  # np.char.replace can't size an empty result
+        types = np.char.replace(types, "-", "_")
+    return np.where(np.isin(types, PROPERTY_TYPES), types, "Other")
+
+
+def normalize_regions(values):
+    regions = np.asarray(values, dtype=str)
+    return np.where(np.isin(regions, REGIONS), regions, "Other")
+
+
+def _codes(values, categories):
+    # Position of each (already normalized) value in categories
+    codes = np.zeros(len(values), dtype=np.int64)
+    for i, category in enumerate(categories):
+        codes[values == category] = i
+    return codes
+
+
+def listing_regions(titles):
+    # Region from the postcode at the end of a listing title, e.g. "..., London, NW3";
+    # the same parser as Property.region (utils.parse_title_postcode)
+    import pandas as pd
+    prefix = pd.Series(titles, dtype=object).astype(str).str.extract(TITLE_POSTCODE)[0]
+    return prefix.map(REGION_MAP).fillna("Other").to_numpy()
+
+
+_U64 = np.uint64
+_SEED, _GROWTH_SALT = _U64(0x9E3779B97F4A7C15), _U64(0xD1B54A32D192ED03)
+_M1, _M2 = _U64(0xBF58476D1CE4E5B9), _U64(0x94D049BB133111EB)
+_S11, _S27, _S30, _S31 = _U64(11), _U64(27), _U64(30), _U64(31)
+
+
+def _mix(h):
+    # splitmix64 finalizer; uint64 arithmetic wraps, which is what we want here
+    h = (h ^ (h >> _S30)) * _M1
+    h = (h ^ (h >> _S27)) * _M2
+    return h ^ (h >> _S31)
+
+
+def listing_assumptions(columns):
+    """(estimated monthly rent, annual growth rate) arrays; the same property always gets the same pair.
+
+    columns needs price, bedrooms, bathrooms, sizeSqFeetMax, property_type and region.
+    """
+    price = np.asarray(columns["price"], dtype=np.float64)
+    fields = (
+        np.round(price * 100),
+        np.asarray(columns["bedrooms"], dtype=np.float64),
+        np.asarray(columns["bathrooms"], dtype=np.float64),
+        np.round(np.asarray(columns["sizeSqFeetMax"], dtype=np.float64) * 10),
+        _codes(normalize_property_types(columns["property_type"]), PROPERTY_TYPES),
+        _codes(normalize_regions(columns["region"]), REGIONS),
+    )
+    h = np.full(len(price), _SEED)
+    for field in fields:
+        h = _mix(h ^ field.astype(np.int64).view(_U64))
+    # Two independent uniforms in [0, 1) from the top 53 bits of two hashes
+    u_rent = (h >> _S11) * 2.0 ** -53
+    u_growth = (_mix(h ^ _GROWTH_SALT) >> _S11) * 2.0 ** -53
+
+    rent_yield = RENT_YIELD_RANGE[0] + u_rent * (RENT_YIELD_RANGE[1] - RENT_YIELD_RANGE[0])
+    growth_rate = GROWTH_RATE_RANGE[0] + u_growth * (GROWTH_RATE_RANGE[1] - GROWTH_RATE_RANGE[0])
+    return price * rent_yield, growth_rate
+
+
+def feature_matrix(columns):
+    """float64 matrix with one row per listing and the columns in FEATURES order.
+
+    columns needs price, bedrooms, bathrooms, sizeSqFeetMax, property_type, region
+    and estimated_rent; property_type and region are normalized here.
+    """
+    price = np.asarray(columns["price"], dtype=np.float64)
+    bedrooms = np.asarray(columns["bedrooms"], dtype=np.float64)
+    bathrooms = np.asarray(columns["bathrooms"], dtype=np.float64)
+    sqft = np.asarray(columns["sizeSqFeetMax"], dtype=np.float64)
+    estimated_rent = np.asarray(columns["estimated_rent"], dtype=np.float64)
+    property_type = normalize_property_types(columns["property_type"])
+    region = normalize_regions(columns["region"])
+
+    X = np.zeros((len(price), len(FEATURES)))
+    X[:, COLUMN["price"]] = price
+    X[:, COLUMN["bedrooms"]] = bedrooms
+    X[:, COLUMN["bathrooms"]] = bathrooms
+    X[:, COLUMN["sizeSqFeetMax"]] = sqft
+    X[:, COLUMN["price_per_bedroom"]] = price / bedrooms
+    X[:, COLUMN["price_per_sqft"]] = price / sqft
+    X[:, COLUMN["estimated_rent"]] = estimated_rent
+    X[:, COLUMN["rent_to_price_ratio"]] = estimated_rent * 12 / price * 100
+    X[:, COLUMN["bedrooms_per_100k"]] = bedrooms / (price / 100_000)
+    X[:, COLUMN["region_score"]] = np.array([REGION_SCORES[r] for r in REGIONS])[_codes(region, REGIONS)]
+    for r in REGIONS:
+        X[:, COLUMN[f"region_{r}"]] = region == r
+    for pt in PROPERTY_TYPES:
+        X[:, COLUMN[f"propertyType_{pt}"]] = property_type == pt
+    return X
+
+
+def clean_listings(df):
+    """The training notebook's cleaning of a raw listings export (London CSV format).
+
+    Drops POA and unpriced rows and listings without bedrooms, fills missing
+    floor areas with DEFAULT_SQFT, and adds region and property_type columns.
+    """
+    import pandas as pd
+    df = df[~df["price"].astype(str).str.contains("POA", na=False)].copy()
+    df["price"] = pd.to_numeric(df["price"].astype(str).str.replace(r"[£,]", "", regex=True), errors="coerce")
+    df["bedrooms"] = pd.to_numeric(df["bedrooms"], errors="coerce")
+    df["bathrooms"] = pd.to_numeric(df["bathrooms"], errors="coerce")
+    df = df.dropna(subset=["price", "bedrooms", "bathrooms", "title"])
+    df = df[(df["bedrooms"] > 0) & (df["price"] > 0)].copy()
+    df["sizeSqFeetMax"] = pd.to_numeric(df["sizeSqFeetMax"], errors="coerce").fillna(DEFAULT_SQFT)
+    df["region"] = listing_regions(df["title"])
+    df["property_type"] = normalize_property_types(df["propertyType"])
+    return df
+
+
+def listing_features(df):
+    """Cleaned listings plus estimated_rent/growth_rate columns, and their feature matrix."""
+    df = clean_listings(df)
+    df["estimated_rent"], df["growth_rate"] = listing_assumptions(df)
+    return df, feature_matrix(df)
@@ -0,0 +1,39 @@
+# backend/gunicorn.conf.py
+# gunicorn -c gunicorn.conf.py wsgi:app
+# Sizing: each worker has its own DB pool, so with WEB_CONCURRENCY workers the database
+# sees up to WEB_CONCURRENCY x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections; with
+# GUNICORN_THREADS > 1 keep DB_POOL_SIZE at least equal to the thread count.
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", 1))
+worker_class = "gthread" if threads > 1 else "sync"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+
+# Import wsgi.py (build the app, load the model) once in the master, then fork
+preload_app = True
+
+
+def post_fork(server, worker):
+    from wsgi import post_fork as reset_connections
+    reset_connections()
+
+
+def on_starting(server):
+    # Per-process metric files from a previous run would be added to this one's
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for name in os.listdir(multiproc_dir):
+            if name.endswith(".db"):
+                os.remove(os.path.join(multiproc_dir, name))
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,134 @@
+# backend/images.py
+# Uploaded property photos are stored under a hash of their content, so identical
+# uploads share one file and a URL never changes meaning. Card and thumbnail
+# variants (JPEG + WebP) are made in a small background pool after the request returns:
+#   properties/<hash>.<ext>              original
+#   properties/<size>/<hash>.jpg|.webp   resized variants
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+IMAGE_SIZES = {
+    'card': (640, 480),
+    'thumb': (240, 180),
+}
+VARIANT_FORMATS = {'jpg': 'JPEG', 'webp': 'WEBP'}
+QUALITY = 82
+
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', '2'))
+IMAGE_QUEUE_MAX = int(os.getenv('IMAGE_QUEUE_MAX', '64'))
+
+HASHED_NAME = re.compile(r'^([0-9a-f]{32})\.(jpg|jpeg|png|gif)$')
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_pending = threading.BoundedSemaphore(IMAGE_QUEUE_MAX)
+_in_flight = set()
+_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix='images')
+    return _executor
+
+
+def _write_atomic(path, write):
+    # Readers only ever see complete files: write next to the target, then rename over it
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def store_upload(upload, folder):
+    """Saves a werkzeug FileStorage as <sha256[:32]>.<ext> and returns the filename.
+
+    Re-uploading the same bytes reuses the stored file.
+    """
+    data = upload.read()
+    ext = upload.filename.rsplit('.', 1)[1].lower()
+    filename = f"{hashlib.sha256(data).hexdigest()[:32]}.{'jpg' if ext == 'jpeg' else ext}"
+    path = os.path.join(folder, filename)
+    if not os.path.exists(path):
+        _write_atomic(path, lambda f: f.write(data))
+    return filename
+
+
+def variant_path(folder, size, filename, fmt):
+    digest = HASHED_NAME.match(filename).group(1)
+    return os.path.join(folder, size, f"{digest}.{fmt}")
+
+
+def variants_ready(folder, filename):
+    return all(
+        os.path.exists(variant_path(folder, size, filename, fmt))
+        for size in IMAGE_SIZES for fmt in VARIANT_FORMATS
+    )
+
+
+def make_variants(folder, filename):
+    from PIL import Image, ImageOps
+
+    with Image.open(os.path.join(folder, filename)) as image:
+        # draft() lets the JPEG decoder downscale while decoding, much cheaper than a full decode
+        image.draft('RGB', IMAGE_SIZES['card'])
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        else:
+            image = image.convert('RGB')
+
+        # Largest first so each smaller size is resampled from an already reduced image
+        for size, box in sorted(IMAGE_SIZES.items(), key=lambda item: -item[1][0]):
+            image.thumbnail(box, Image.LANCZOS)
+            os.makedirs(os.path.join(folder, size), exist_ok=True)
+            for fmt, pil_format in VARIANT_FORMATS.items():
+                _write_atomic(
+                    variant_path(folder, size, filename, fmt),
+                    lambda f: image.save(f, pil_format, quality=QUALITY, optimize=(fmt == 'jpg'))
+                )
+
+
+def schedule_variants(folder, filename):
+    """Queues make_variants on the pool and returns immediately.
+
+    Returns False (and does nothing) when the queue is full or the image is already
+    queued; serve_uploaded_image schedules it again the next time a variant is missing.
+    """
+    key = os.path.join(folder, filename)
+    with _lock:
+        if key in _in_flight:
+            return False
+        if not _pending.acquire(blocking=False):
+            logger.warning("Image queue full, not resizing %s yet", filename)
+            return False
+        _in_flight.add(key)
+
+    def run():
+        try:
+            make_variants(folder, filename)
+        except Exception:
+            logger.exception("Resizing image %s failed", filename)
+        finally:
+            with _lock:
+                _in_flight.discard(key)
+            _pending.release()
+
+    get_executor().submit(run)
+    return True
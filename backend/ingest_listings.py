@@ -0,0 +1,112 @@
+# run this file to load a listings CSV (same format as models/realestate_data_london_2024_nov.csv)
+# into the properties table:  python ingest_listings.py [path/to/listings.csv] [--chunk-size N]
+# Re-running the same file updates rows in place instead of duplicating them.
+import argparse
+import hashlib
+import os
+import time
+
+import pandas as pd
+from sqlalchemy import case
+
+from app import create_app
+from extensions import db, conflict_insert
+from models import Property
+from data_versions import PROPERTIES, bump_data_version
+from features import clean_listings
+from utils import REGION_MAP, TITLE_POSTCODE
+
+app = create_app()
+
+DEFAULT_CSV = os.path.join(os.path.dirname(__file__), "models", "realestate_data_london_2024_nov.csv")
+CHUNK_SIZE = 50_000
+SOURCE = 'dataset'
+DATASET_USER = 'dataset'
+
+CSV_COLUMNS = ["title", "descriptionHtml", "propertyType", "bedrooms", "bathrooms", "price", "sizeSqFeetMax"]
+UPDATE_COLUMNS = ["title", "price", "location", "bedrooms", "bathrooms", "property_type", "description",
+                  "postcode_district", "region"]
+
+
+def clean_chunk(df):
+    # The training notebook's cleaning (features.clean_listings), then the table's columns
+    df = clean_listings(df)
+
+    # Same parser as utils.parse_title_postcode, over the whole column
+    postcode = df['title'].str.extract(TITLE_POSTCODE)
+    location = (postcode[0].map(REGION_MAP) + ' London').fillna('London')
+
+    description = (df['descriptionHtml'].fillna('')
+                   .str.replace(r'<[^>]+>', ' ', regex=True)
+                   .str.replace(r'\s+', ' ', regex=True)
+                   .str.strip())
+
+    # No listing id in the export, so the natural key is a hash of the fields that identify a listing
+    natural_key = (df['title'] + '|' + df['propertyType'].fillna('') + '|' +
+                   df['bedrooms'].astype(int).astype(str) + '|' + df['bathrooms'].astype(int).astype(str) + '|' +
+                   df['descriptionHtml'].fillna(''))
+    external_id = [hashlib.sha1(key.encode('utf-8')).hexdigest() for key in natural_key]
+
+    out = pd.DataFrame({
+        'external_id': external_id,
+        'title': df['title'].str.strip().str.slice(0, 255),
+        'price': df['price'].round().astype('int64'),
+        'location': location,
+        'bedrooms': df['bedrooms'].astype(int),
+        'bathrooms': df['bathrooms'].astype(int),
+        'property_type': df['propertyType'].fillna('Other').str.slice(0, 50),
+        'description': description,
+        # None rather than NaN, so the driver writes NULL
+        'postcode_district': (postcode[0] + postcode[1]).astype(object).where(postcode[0].notna(), None),
+        'region': df['region'],
+    }, index=df.index)
+    # One statement can't upsert the same key twice, the last occurrence wins
+    out = out.drop_duplicates(subset='external_id', keep='last')
+    out['image_url'] = '/images/properties/defaultprop.jpg'
+    out['created_by'] = DATASET_USER
+    out['source'] = SOURCE
+    return out
+
+
+def upsert_statement():
+    table = Property.__table__
+    statement = conflict_insert(table)
+    excluded = statement.excluded
+    update = {column: excluded[column] for column in UPDATE_COLUMNS}
+    # A changed price makes the stored score stale, backfill_scores.py re-scores those rows
+    update['model_version'] = case((table.c.price != excluded.price, None), else_=table.c.model_version)
+    return statement.on_conflict_do_update(index_elements=['source', 'external_id'], set_=update)
+
+
+def ingest(path, chunk_size=CHUNK_SIZE):
+    statement = upsert_statement()
+    total = 0
+    start = time.perf_counter()
+
+    for chunk in pd.read_csv(path, usecols=CSV_COLUMNS, chunksize=chunk_size, encoding='utf-8-sig'):
+        rows = clean_chunk(chunk)
+        if rows.empty:
+            continue
+        # executemany: the driver batches the rows of the chunk into multi-row statements
+        db.session.execute(statement, rows.to_dict('records'))
+        bump_data_version(PROPERTIES)
+        db.session.commit()
+
+        total += len(rows)
+        elapsed = time.perf_counter() - start
+        print(f"Upserted {total} listings ({total / elapsed:,.0f} rows/s)")
+
+    elapsed = time.perf_counter() - start
+    return total, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load a listings CSV into the properties table")
+    parser.add_argument("path", nargs="?", default=DEFAULT_CSV)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with app.app_context():
+        total, elapsed = ingest(args.path, args.chunk_size)
+        print(f"Ingest complete, {total} listings in {elapsed:.1f}s "
+              f"({total / elapsed if elapsed else 0:,.0f} rows/s). Run backfill_scores.py to score new rows.")
@@ -0,0 +1,233 @@
+# backend/logs.py
+# Logging for the backend. Request threads only put records on a queue; a
+# QueueListener thread redacts, formats (JSON lines by default) and writes them,
+# so a slow stdout or log pipeline never holds up a request.
+#
+#   LOG_LEVEL=INFO                               root level
+#   LOG_LEVELS=routes=DEBUG,sqlalchemy.engine=INFO  per-module overrides
+#   LOG_FORMAT=json|text
+#
+# Modules log through logging.getLogger(__name__); a logger.debug() call below its
+# module's level returns straight away. Records logged during a request carry
+# method, route and user fields, and every request ends with one access record
+# with its status and latency_ms.
+import atexit
+import collections
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import time
+
+from flask import g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Longest a record waits on the queue before it is written
+FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", 0.05))
+
+access_logger = logging.getLogger("access")
+
+REDACTED = "[REDACTED]"
+# Extra fields with these names are replaced wholesale
+SECRET_FIELDS = re.compile(r"authorization|password|passwd|secret|token|api[_-]?key|cookie", re.I)
+# ...and secrets inside messages and string fields are masked. SECRET_HINTS are cheap
+# substring checks that rule out almost every line before the patterns run.
+SECRET_HINTS = ("bearer", "eyj", "passw", "secret", "token", "api_key", "authorization")
+SECRET_PATTERNS = [
+    (re.compile(r"(Bearer\s+)[\w.~+/=-]+", re.I), r"\1" + REDACTED),
+    (re.compile(r"eyJ[\w-]+\.[\w-]+\.[\w-]+"), REDACTED),  # JWTs anywhere else
+    (re.compile(r"""(['"]?(?:password|passwd|secret|token|access_token|refresh_token|api_key|authorization)['"]?"""
+                r"""\s*[:=]\s*['"]?)[^'",\s}]+""", re.I), r"\1" + REDACTED),
+]
+
+# Attributes every LogRecord has; anything else was passed through extra=
+STANDARD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_queue = None
+_listener = None
+_running = False
+_handlers = []
+
+
+@functools.lru_cache(maxsize=1024)
+def is_secret_field(name):
+    return SECRET_FIELDS.search(name) is not None
+
+
+def redact(text):
+    lowered = text.lower()
+    if not any(hint in lowered for hint in SECRET_HINTS):
+        return text
+    for pattern, replacement in SECRET_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class RedactingFilter(logging.Filter):
+    """Masks secrets in the message and extra fields; runs on the listener thread."""
+
+    def filter(self, record):
+        record.msg = redact(record.getMessage())
+        record.args = None
+        if record.exc_text:
+            record.exc_text = redact(record.exc_text)
+        fields = vars(record)
+        for name in fields.keys() - STANDARD_FIELDS:
+            value = fields[name]
+            if is_secret_field(name):
+                setattr(record, name, REDACTED)
+            elif isinstance(value, str):
+                setattr(record, name, redact(value))
+        return True
+
+
+class RequestQueueHandler(logging.handlers.QueueHandler):
+    """Adds request fields and enqueues the record without formatting it.
+
+    The stock QueueHandler formats the message on the calling thread; here the
+    arguments are merged on the listener thread instead, so pass values that won't
+    change after the call (the usual case: numbers, strings, ids).
+    """
+
+    def prepare(self, record):
+        if has_request_context():
+            rule = request.url_rule
+            record.method = request.method
+            record.route = rule.rule if rule is not None else request.path
+            if not hasattr(record, "user"):
+                record.user = request_user()
+        if record.exc_info:
+            # Tracebacks must be rendered while the frames still exist
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, then any extra fields."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = vars(record)
+        for name in fields.keys() - STANDARD_FIELDS:
+            entry[name] = fields[name]
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Wakes once per FLUSH_INTERVAL at most and handles everything queued since.
+
+    Waking the listener for each record costs the request threads a thread switch
+    (and the GIL) per log line; batching turns that into one switch per interval.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending = collections.deque()
+
+    def dequeue(self, block):
+        if not self._pending:
+            self._pending.append(self.queue.get(block))
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                while True:
+                    self._pending.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+        return self._pending.popleft()
+
+
+def request_user():
+    # The JWT identity, once a route has verified the token
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        return None
+
+
+def _output_handler():
+    handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "text":
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        handler.setFormatter(JsonLineFormatter())
+    handler.addFilter(RedactingFilter())
+    return handler
+
+
+def _start_listener():
+    global _queue, _listener, _running
+    _queue = queue.SimpleQueue()
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, RequestQueueHandler):
+            handler.queue = _queue
+    _listener = BatchingQueueListener(_queue, *_handlers, respect_handler_level=True)
+    _listener.start()
+    _running = True
+
+
+def _stop_listener():
+    # Flushes whatever is still queued
+    global _running
+    if _running:
+        _listener.stop()
+        _running = False
+
+
+def _restart_after_fork():
+    # The listener thread doesn't survive a fork (e.g. gunicorn workers forked from
+    # a preloaded master); give the child its own queue and thread
+    if _listener is not None:
+        _start_listener()
+
+
+def configure_logging():
+    """Routes the root logger through the queue; safe to call more than once."""
+    if _listener is not None:
+        return
+    _handlers.append(_output_handler())
+
+    root = logging.getLogger()
+    root.handlers[:] = [RequestQueueHandler(queue.SimpleQueue())]
+    root.setLevel(LOG_LEVEL)
+    for item in filter(None, (part.strip() for part in LOG_LEVELS.split(","))):
+        name, _, level = item.partition("=")
+        logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+    _start_listener()
+    atexit.register(_stop_listener)
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def _start_request():
+    g.log_start = time.perf_counter()
+
+
+def _log_request(response):
+    start = g.pop("log_start", None)
+    if start is not None and access_logger.isEnabledFor(logging.INFO):
+        access_logger.info("%s %s %s", request.method, request.path, response.status_code,
+                           extra={"status": response.status_code,
+                                  "latency_ms": round((time.perf_counter() - start) * 1000, 2)})
+    return response
+
+
+def init_app(app):
+    """Configures logging and adds an access record for every request of app."""
+    configure_logging()
+    app.before_request(_start_request)
+    app.after_request(_log_request)
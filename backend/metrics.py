@@ -0,0 +1,118 @@
+# backend/metrics.py
+# Prometheus metrics served at /metrics: per-endpoint latency and status counts,
+# SQL statements (count and time) per request, and recommendation inference time.
+#
+# Under gunicorn every worker keeps its own counters; set PROMETHEUS_MULTIPROC_DIR
+# to an empty directory shared by the workers and /metrics aggregates them
+# (gunicorn.conf.py clears it at startup and cleans up after dead workers).
+import os
+import time
+from contextvars import ContextVar
+
+from flask import Response, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+REQUEST_LATENCY = Histogram(
+    "investr_http_request_duration_seconds", "Time to handle a request, including streaming the body",
+    ["method", "endpoint"], buckets=LATENCY_BUCKETS)
+REQUESTS = Counter(
+    "investr_http_requests_total", "Requests handled, by response status",
+    ["method", "endpoint", "status"])
+SQL_STATEMENTS = Histogram(
+    "investr_db_statements_per_request", "SQL statements executed while handling a request",
+    ["endpoint"], buckets=STATEMENT_BUCKETS)
+SQL_TIME = Histogram(
+    "investr_db_time_per_request_seconds", "Total time spent in SQL statements while handling a request",
+    ["endpoint"], buckets=LATENCY_BUCKETS)
+INFERENCE_LATENCY = Histogram(
+    "investr_recommendation_inference_seconds", "Time to score one call to the recommender (cache lookups included)",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0))
+RECOMMENDATIONS = Counter(
+    "investr_recommendations_total", "Properties scored, by where the answer came from", ["source"])
+
+# [method, endpoint, status, start, statements, sql seconds] for the request being handled
+_current = ContextVar("investr_request_metrics", default=None)
+_engine_events = False
+# Labelled children by (method, endpoint) and (method, endpoint, status); .labels() takes a lock each call
+_endpoint_metrics = {}
+_status_counters = {}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    current = _current.get()
+    start = getattr(context, "_metrics_start", None)
+    if current is not None and start is not None:
+        current[4] += 1
+        current[5] += time.perf_counter() - start
+
+
+def _start_request():
+    rule = request.url_rule
+    _current.set([request.method, rule.rule if rule is not None else "unmatched", None, time.perf_counter(), 0, 0.0])
+
+
+def _record_status(response):
+    current = _current.get()
+    if current is not None:
+        current[2] = response.status_code
+    return response
+
+
+def _finish_request(exc):
+    # Teardown runs after a streamed body has been sent, so its time is included
+    current = _current.get()
+    if current is None:
+        return
+    _current.set(None)
+    method, endpoint, status, start, statements, sql_seconds = current
+    elapsed = time.perf_counter() - start
+
+    children = _endpoint_metrics.get((method, endpoint))
+    if children is None:
+        children = _endpoint_metrics[method, endpoint] = (
+            REQUEST_LATENCY.labels(method, endpoint), SQL_STATEMENTS.labels(endpoint), SQL_TIME.labels(endpoint))
+    latency, sql_statements, sql_time = children
+    latency.observe(elapsed)
+    sql_statements.observe(statements)
+    sql_time.observe(sql_seconds)
+
+    key = (method, endpoint, status or 500)
+    counter = _status_counters.get(key)
+    if counter is None:
+        counter = _status_counters[key] = REQUESTS.labels(method, endpoint, str(status or 500))
+    counter.inc()
+
+
+def metrics():
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_app(app):
+    """Records every request of app and adds the /metrics endpoint."""
+    global _engine_events
+    if not _engine_events:
+        # Engine-class listeners see every engine, including ones created later
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _engine_events = True
+
+    app.before_request(_start_request)
+    app.after_request(_record_status)
+    app.teardown_request(_finish_request)
+    app.add_url_rule("/metrics", view_func=metrics)
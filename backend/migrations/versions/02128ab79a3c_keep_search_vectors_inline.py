@@ -0,0 +1,32 @@
+"""keep search vectors inline
+
+Revision ID: 02128ab79a3c
+Revises: 8b0e1ac9f781
+Create Date: 2026-10-18 23:41:07.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import text_search
+
+
+# revision identifiers, used by Alembic.
+revision = '02128ab79a3c'
+down_revision = '8b0e1ac9f781'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # PostgreSQL only (SQLite has no tsvector column). Changing the storage alone only
+    # applies to rows written afterwards, so the column is rebuilt, which rewrites
+    # every row with its vector inline
+    if op.get_bind().dialect.name == 'postgresql':
+        text_search.drop_text_index(op.get_bind())
+        text_search.create_text_index(op.get_bind())
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE properties ALTER COLUMN search_vector SET STORAGE EXTENDED")
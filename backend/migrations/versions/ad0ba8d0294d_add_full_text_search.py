@@ -0,0 +1,28 @@
+"""add full text search
+
+Revision ID: ad0ba8d0294d
+Revises: 7b6d6c023a9a
+Create Date: 2026-10-18 20:02:27.485532
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+import text_search
+
+
+# revision identifiers, used by Alembic.
+revision = 'ad0ba8d0294d'
+down_revision = '7b6d6c023a9a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Generated tsvector column + GIN index on PostgreSQL, FTS5 table + triggers on
+    # SQLite; both index the existing rows as part of the upgrade
+    text_search.create_text_index(op.get_bind())
+
+
+def downgrade():
+    text_search.drop_text_index(op.get_bind())
@@ -1,6 +1,12 @@
 # models py
 from datetime import datetime
+from sqlalchemy.dialects.sqlite import DATETIME as SQLITE_DATETIME
+
 from extensions import db
+import text_search
+
+SQLITE_TIMESTAMP = SQLITE_DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d "
+                                                  "%(hour)02d:%(minute)02d:%(second)02d")
 
 class User(db.Model):
     __tablename__ = 'user'
@@ -23,8 +29,42 @@ class Property(db.Model):
     description = db.Column(db.Text)
     image_url = db.Column(db.String(255))
     created_by = db.Column(db.String(128), nullable=False)
-    created_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
+    # Stored by SQLite's CURRENT_TIMESTAMP without fractional seconds; cursor values
+    # must be bound in that format too, or equal timestamps compare unequal as text
+    created_at = db.Column(db.DateTime().with_variant(SQLITE_TIMESTAMP, 'sqlite'), nullable=False,
+                           server_default=db.func.current_timestamp())
     source = db.Column(db.String(20), default='user')
+    # Natural key of imported listings (see ingest_listings.py); NULL for user listings
+    external_id = db.Column(db.String(40))
+    # Investment score materialised at write time (see scoring.py)
+    recommendation = db.Column(db.String(10))
+    confidence = db.Column(db.Float)
+    investment_score = db.Column(db.Float, index=True)  # probability of "Buy", 0-100
+    model_version = db.Column(db.String(64), index=True)
+    # Parsed from the title (location as fallback for region) at write time, see utils.property_location_columns
+    postcode_district = db.Column(db.String(8))  # outward code, e.g. "NW3"
+    region = db.Column(db.String(10))  # North/South/East/West/Central/Other
+
+    # Composite indexes for the filter combinations used by GET /api/properties
+    __table_args__ = (
+        db.Index('uq_properties_source_external_id', 'source', 'external_id', unique=True),
+        db.Index('ix_properties_location_price', 'location', 'price'),
+        db.Index('ix_properties_price_id', 'price', 'id'),
+        db.Index('ix_properties_bedrooms_price', 'bedrooms', 'price'),
+        db.Index('ix_properties_created_at_id', 'created_at', 'id'),
+        # property_type is matched case-insensitively, so index its lower-cased value
+        db.Index('ix_properties_property_type_lower_price', db.func.lower(property_type), 'price'),
+        db.Index('ix_properties_region_price', 'region', 'price'),
+        db.Index('ix_properties_postcode_district_price', 'postcode_district', 'price'),
+        # sort=score orders by this (unscored rows as -1, after every 0-100 score), see SCORE_SORT_KEY
+        db.Index('ix_properties_score_id', db.func.coalesce(investment_score, db.literal_column('-1')), 'id'),
+    )
+
+# Full-text index over title and description, created alongside the table
+text_search.attach(Property.__table__)
+
+# Must render exactly like ix_properties_score_id's expression for the index to serve it
+SCORE_SORT_KEY = db.func.coalesce(Property.investment_score, db.literal_column('-1'))
 
 class Favorite(db.Model):
     __tablename__ = 'favourites'
@@ -33,7 +73,20 @@ class Favorite(db.Model):
     property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=False)
     saved_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
 
+    # One row per saved property; also serves the lookups by user_id
+    __table_args__ = (
+        db.Index('uq_favourites_user_property', 'user_id', 'property_id', unique=True),
+    )
+
+
+
 
+class DataVersion(db.Model):
+    # Bumped in the same transaction as writes; backs the ETag/Last-Modified validators
+    __tablename__ = 'data_versions'
+    name = db.Column(db.String(160), primary_key=True)  # 'properties' or 'favourites:<firebase uid>'
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False)
 
 
 class NewsArticle(db.Model):
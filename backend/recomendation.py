@@ -1,28 +1,150 @@
 # backend/investment_tools/recommendation.py
-import joblib
-import pandas as pd
+import hashlib
+import logging
+import threading
+import time
+import numpy as np
 import os
 
+from features import FEATURES
+from prediction_cache import PredictionCache
+from metrics import INFERENCE_LATENCY, RECOMMENDATIONS
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDATIONS_FROM_CACHE = RECOMMENDATIONS.labels("cache")
+RECOMMENDATIONS_FROM_MODEL = RECOMMENDATIONS.labels("model")
+
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "models", "recommendation_model.pkl")
-model = joblib.load(MODEL_PATH)
 
+# Bump when features.py changes what the model is fed, so stored scores and cached
+# predictions made with the old features are recomputed
+FEATURES_VERSION = 3
+
+# Stored scores carry this so rows scored by an older model (or older features) can be found and re-scored
+with open(MODEL_PATH, "rb") as model_file:
+    MODEL_VERSION = hashlib.sha256(model_file.read() + f"features-v{FEATURES_VERSION}".encode()).hexdigest()[:12]
+
+# Predictions keyed by (MODEL_VERSION, feature vector); a new model never sees old entries
+recommendation_cache = PredictionCache(max_entries=int(os.getenv("RECOMMENDATION_CACHE_MAX_ENTRIES", 10_000)))
+
+# RECOMMENDER_BACKEND=sklearn scores with the pickled estimator instead of the compiled arrays
+RECOMMENDER_BACKEND = os.getenv("RECOMMENDER_BACKEND", "compiled")
+
+# Compiled arrays are saved here as .npy files, one directory per MODEL_VERSION, and
+# memory-mapped by every worker, so N workers hold one copy of the model between them.
+# Built from the pickle on first use if missing; `python recomendation.py` builds it ahead of time.
+COMPILED_MODEL_DIR = os.getenv("COMPILED_MODEL_DIR", os.path.join(os.path.dirname(__file__), "models", "compiled"))
+
+# Unpickling pulls in sklearn/scipy, so the model is loaded on first use (or by warm_up)
+_model = None
+_compiled_model = None
+_model_lock = threading.RLock()
+
+def get_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                import joblib
+                _model = joblib.load(MODEL_PATH)
+    return _model
+
+def compiled_model_path():
+    return os.path.join(COMPILED_MODEL_DIR, MODEL_VERSION)
+
+def build_compiled_model():
+    # Compiles the pickled model and saves the arrays; a no-op if another process already has
+    from compiled_model import compile_model, save_compiled_model
+    path = compiled_model_path()
+    if not os.path.isfile(os.path.join(path, "meta.json")):
+        save_compiled_model(compile_model(get_model()), path, model_version=MODEL_VERSION)
+    return path
+
+def get_compiled_model():
+    # None when RECOMMENDER_BACKEND=sklearn
+    global _compiled_model
+    if RECOMMENDER_BACKEND != "compiled":
+        return None
+    if _compiled_model is None:
+        with _model_lock:
+            if _compiled_model is None:
+                from compiled_model import compile_model, load_compiled_model
+                try:
+                    _compiled_model = load_compiled_model(build_compiled_model())
+                except OSError as e:
+                    # Read-only checkout: keep a private in-memory copy rather than fail
+                    logger.warning("Could not use a compiled model artifact (%s), compiling in memory", e)
+                    _compiled_model = compile_model(get_model())
+    return _compiled_model
 
-FEATURES = [
-    "price", "bedrooms", "bathrooms", "sizeSqFeetMax",
-    "price_per_bedroom", "price_per_sqft",
-    "estimated_rent", "rent_to_price_ratio", "bedrooms_per_100k", "region_score",
-    "region_Central", "region_East", "region_North", "region_Other",
-    "region_South", "region_West",
-    "propertyType_Detached", "propertyType_Flat", "propertyType_House",
-    "propertyType_Other", "propertyType_Semi_Detached", "propertyType_Terraced"
-]
+def model_classes():
+    compiled_model = get_compiled_model()
+    return compiled_model.classes_ if compiled_model is not None else get_model().classes_
+
+def warm_up():
+    # With the compiled backend (and its artifact built) sklearn is never imported
+    if get_compiled_model() is None:
+        get_model()
+
+
+REGION_BENCHMARK_RATES = {
+    "Central": 0.035,
+    "North": 0.030,
+    "South": 0.035,
+    "East": 0.040,
+    "West": 0.030,
+    "Other": 0.035
+}
+
+def build_feature_matrix(data_dicts):
+    # One row per property, columns in FEATURES order
+    return np.array([[d.get(f, 0) for f in FEATURES] for d in data_dicts], dtype=np.float64)
+
+def predict_proba(X):
+    compiled_model = get_compiled_model()
+    if compiled_model is not None:
+        return compiled_model.predict_proba(X)
+    import pandas as pd
+    return get_model().predict_proba(pd.DataFrame(X, columns=FEATURES))
+
+def predict_recommendations(data_dicts):
+    if not data_dicts:
+        return []
+    return recommend_feature_matrix(build_feature_matrix(data_dicts))
+
+def recommend_feature_matrix(X):
+    # Scores a whole batch with a single predict_proba pass; labels are derived
+    # from the probabilities the same way CalibratedClassifierCV.predict does.
+    # Rows seen before (same feature vector, same model) come from the cache.
+    start = time.perf_counter()
+    keys = [(MODEL_VERSION, row.tobytes()) for row in X]
+    results = [recommendation_cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    if missing:
+        proba = predict_proba(X[missing])
+        best = proba.argmax(axis=1)
+        labels = model_classes()[best]
+        confidences = proba[np.arange(len(best)), best] * 100
+        for i, label, confidence in zip(missing, labels, confidences):
+            results[i] = {
+                "recommendation": "Buy" if label == 1 else "Avoid",
+                "confidence": round(float(confidence), 1)
+            }
+            recommendation_cache.put(keys[i], results[i])
+
+    INFERENCE_LATENCY.observe(time.perf_counter() - start)
+    RECOMMENDATIONS_FROM_CACHE.inc(len(keys) - len(missing))
+    RECOMMENDATIONS_FROM_MODEL.inc(len(missing))
+
+    # Copies, so callers can't change what is cached
+    return [dict(result) for result in results]
 
 def predict_recommendation(data_dict):
-    ordered_features = [data_dict.get(f, 0) for f in FEATURES]
-    df = pd.DataFrame([ordered_features], columns=FEATURES)
-    prediction = model.predict(df)[0]
-    confidence = model.predict_proba(df)[0][prediction] * 100
-    return {
-        "recommendation": "Buy" if prediction == 1 else "Avoid",
-        "confidence": round(confidence, 1)
-    }
+    return predict_recommendations([data_dict])[0]
+
+
+if __name__ == "__main__":
+    # Build the memory-mappable model artifact, e.g. at deploy time before starting workers
+    print(f"Compiled model {MODEL_VERSION} -> {build_compiled_model()}")
@@ -1,32 +1,55 @@
 # routes.py
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, stream_with_context, make_response
+import base64
+import binascii
+import hashlib
+import itertools
 import json
+import logging
+import math
 from fauth import signup, login_user
-from werkzeug.utils import secure_filename
 from fconfig import verify_token
-from models import User, Property,Favorite
-from extensions import db  # Import db
-from sqlalchemy import and_
-from sqlalchemy.exc import SQLAlchemyError
+from models import User, Property,Favorite, SCORE_SORT_KEY
+from extensions import db, conflict_insert  # Import db
+from sqlalchemy import and_, or_, func, delete
+from sqlalchemy.orm import load_only
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token, JWTManager
-from datetime import timedelta
-from utils import allowed_file
-import pandas as pd
+from datetime import datetime, timedelta
+from utils import allowed_file, property_location_columns
+from images import store_upload, schedule_variants
+from scoring import score_properties, property_columns
+from search_cache import property_search_cache
+import text_search
+from similarity import get_similarity_index, refresh as refresh_similarity_index, index_properties, \
+    forget_properties, listing_vectors
+from data_versions import PROPERTIES, favourites_key, bump_data_version, get_data_version
+from simulation import project, summarize, monte_carlo, MAX_PATHS, MAX_YEARS
 import numpy as np
-import math
 
-from recomendation import predict_recommendation, FEATURES, model
+from recomendation import recommend_feature_matrix, recommendation_cache, REGION_BENCHMARK_RATES
+from features import COLUMN as FEATURE_COLUMN, DEFAULT_SQFT, feature_matrix, listing_assumptions
 import os
 
 UPLOAD_FOLDER = 'frontend/public/images/properties'
 
 bp = Blueprint('main', __name__)
+logger = logging.getLogger(__name__)
 
 @bp.route('/')
 def index():
     return "Welcome to Investr API!"
 
 
+# Firebase uids known to have a User row in this process
+KNOWN_USERS_MAX = 100_000
+known_user_uids = set()
+
+def remember_user(firebase_uid):
+    if len(known_user_uids) >= KNOWN_USERS_MAX:
+        known_user_uids.clear()
+    known_user_uids.add(firebase_uid)
+
 @bp.route('/api/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -38,7 +61,7 @@ def register():
 
     try:
         user_data = signup(email, password)  # Call Firebase signup
-        print("DEBUG: Firebase user_data:", user_data)  # Log Firebase response
+        logger.debug("Firebase signup returned uid %s", user_data.get("firebase_uid"))
 
         firebase_uid = user_data.get("firebase_uid")
         if not firebase_uid:
@@ -53,7 +76,8 @@ def register():
         new_user = User(firebase_uid=firebase_uid, email=email)
         db.session.add(new_user)
         db.session.commit()
-        print(" User successfully saved to PostgreSQL!")
+        remember_user(firebase_uid)
+        logger.info("Registered user %s", firebase_uid)
 
         return jsonify({
             "message": "User registered successfully",
@@ -61,7 +85,7 @@ def register():
         }), 201
 
     except Exception as e:
-        print(" ERROR in /api/register:", str(e))  # Log the full error
+        logger.exception("Registration failed")
         return jsonify({"error": str(e)}), 500  # Return error message
 
 
@@ -79,16 +103,19 @@ def login():
         user_data = login_user(email, password)  # Calls Firebase authentication
         firebase_uid = user_data.get("firebase_uid")
 
-        #  Check if user exists in PostgreSQL; if not, create one
-        user = User.query.filter_by(firebase_uid=firebase_uid).first()
-        if not user:
-            print(f"User not found in DB. Creating new entry for {firebase_uid}")
-            user = User(firebase_uid=firebase_uid, email=email)
-            db.session.add(user)
-            db.session.commit()
+        #  Check if user exists in PostgreSQL; if not, create one. Users are never
+        #  deleted, so once a uid has been seen the lookup can be skipped.
+        if firebase_uid not in known_user_uids:
+            user = User.query.filter_by(firebase_uid=firebase_uid).first()
+            if not user:
+                logger.info("User %s not found in DB, creating it", firebase_uid)
+                user = User(firebase_uid=firebase_uid, email=email)
+                db.session.add(user)
+                db.session.commit()
+            remember_user(firebase_uid)
 
         #  Generate JWT token for authentication
-        access_token = create_access_token(identity=user.firebase_uid, expires_delta=timedelta(hours=1))
+        access_token = create_access_token(identity=firebase_uid, expires_delta=timedelta(hours=1))
 
         return jsonify({
             "message": "User logged in successfully",
@@ -97,7 +124,7 @@ def login():
         }), 200
 
     except Exception as e:
-        print("ERROR in /api/login:", str(e))  # Debugging
+        logger.warning("Login failed: %s", e)
         return jsonify({"error": str(e)}), 400
 
 
@@ -107,15 +134,184 @@ def properties_handler():
         return handle_get_properties()
     elif request.method == 'POST':
         return handle_post_property()
+PROPERTY_FIELDS = [
+    "id", "title", "price", "location", "bedrooms", "bathrooms", "property_type",
+    "description", "image_url", "created_by", "source",
+    "recommendation", "confidence", "investment_score",
+    "postcode_district", "region"
+]
+
+# sort name -> (column, descending); ties are broken on id in the same direction.
+# Every sort key is non-null, so each order is a plain scan of its (key, id) index
+# (backwards for descending) and the keyset is a single row comparison.
+PROPERTY_SORTS = {
+    "price": (Property.price, False),
+    "newest": (Property.created_at, True),
+    "score": (SCORE_SORT_KEY, True),
+}
+# Best text match first, among the newest matches (see text_search.py); needs q=,
+# and is the default sort when q= is given
+RELEVANCE_SORT = "relevance"
+# "true" on relevance-sorted responses when older matches were left out of the
+# ranking; paginated responses also carry it as "truncated"
+TRUNCATED_HEADER = "X-Search-Truncated"
+
+MAX_PAGE_SIZE = 100
+
+def encode_cursor(sort, value, property_id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, property_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+def decode_cursor(cursor, sort):
+    cursor_sort, value, property_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if cursor_sort != sort:
+        raise ValueError("Cursor was issued for a different sort order")
+    if sort == "newest":
+        value = datetime.fromisoformat(value)
+    elif sort in ("score", RELEVANCE_SORT):
+        value = float(value)
+    return value, int(property_id)
+
+def keyset_filter(sort, value, property_id):
+    # Rows strictly after (value, id) in the sort order. Spelled out rather than as a
+    # row comparison so the bound on the key is an index range on both databases
+    # (SQLite won't range-scan a row value over the score expression index).
+    column, descending = PROPERTY_SORTS[sort]
+    if descending:
+        return and_(column <= value, or_(column < value, Property.id < property_id))
+    return and_(column >= value, or_(column > value, Property.id > property_id))
+
+def load_ranked(query, ranked):
+    # (property, relevance) for each (relevance, id) in ranked, in the same order
+    by_id = {property.id: property
+             for property in query.filter(Property.id.in_([property_id for _, property_id in ranked]))}
+    return [(by_id[property_id], relevance) for relevance, property_id in ranked if property_id in by_id]
+
+def serialize_property(property, fields=PROPERTY_FIELDS):
+    return {field: getattr(property, field) for field in fields}
+
+def is_not_modified(etag, last_modified):
+    # If-None-Match wins over If-Modified-Since when both are sent (RFC 9110)
+    if request.if_none_match:
+        # Weak comparison: gzip and proxies may hand back our tag as W/"..."
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return bool(since and last_modified and last_modified <= since.replace(tzinfo=None))
+
+def add_validators(response, etag, last_modified, private=False):
+    # no-cache: browsers may keep the body but must revalidate, which is a cheap 304
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache' if private else 'no-cache'
+    if private:
+        response.vary.add('Authorization')
+    return response
+
+def conditional_get(etag, last_modified, private, build):
+    # Answers 304 before running the query; validators only go on 200 responses
+    if is_not_modified(etag, last_modified):
+        return add_validators(current_app.response_class(status=304), etag, last_modified, private)
+    response = make_response(build())
+    if response.status_code == 200:
+        add_validators(response, etag, last_modified, private)
+    return response
+
 def handle_get_properties():
+    version, updated_at = get_data_version(PROPERTIES)
+    key = property_search_cache.key_for(request.args)
+    etag = f"p{version}-{hashlib.sha1(repr(key).encode()).hexdigest()[:16]}"
+    # Versioned cache keys: a write in another worker (or one racing this request)
+    # can't leave an old body cached under the new ETag
+    return conditional_get(etag, updated_at, False, lambda: find_properties((version, key)))
+
+def find_properties(key):
+    if wants_stream():
+        # Streamed bodies are never buffered, so they can't be cached either
+        return search_properties()
+
+    cached = property_search_cache.get(key)
+    if cached is not None:
+        body, status, headers = cached
+        return current_app.response_class(body, status=status, headers=headers, mimetype='application/json')
+
+    response, status = search_properties()
+    # Empty searches (404) are cached too; bad requests and errors are not
+    if status in (200, 404):
+        headers = [(name, value) for name, value in response.headers if name == TRUNCATED_HEADER]
+        property_search_cache.put(key, response.get_data(), status, headers)
+    return response, status
+
+STREAM_BATCH_SIZE = 1000
+
+def wants_stream():
+    return request.args.get('stream', '').lower() in ('1', 'true')
+
+def stream_properties(properties, fields):
+    # Writes the JSON array one batch at a time; yield_per keeps only a batch of rows in memory
+    def generate():
+        yield '['
+        separator = ''
+        batch = []
+        for property in properties:
+            batch.append(serialize_property(property, fields))
+            if len(batch) >= STREAM_BATCH_SIZE:
+                yield separator + current_app.json.dumps(batch, separators=(',', ':'))[1:-1]
+                separator = ','
+                batch = []
+        if batch:
+            yield separator + current_app.json.dumps(batch, separators=(',', ':'))[1:-1]
+        yield ']'
+
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+def search_properties():
     try:
         locations = request.args.getlist('location')
+        regions = request.args.getlist('region')
+        districts = [d.strip().upper() for d in request.args.getlist('postcode_district')]
         min_price = request.args.get('min_price', type=int)
         max_price = request.args.get('max_price', type=int)
         property_type = request.args.get('property_type')
         min_bedrooms = request.args.get('min_bedrooms', type=int)
-
-        print(f"DEBUG: Searching properties with filters - Locations: {locations}, Min Price: {min_price}, Max Price: {max_price}, Type: {property_type}, Min Bedrooms: {min_bedrooms}")
+        min_confidence = request.args.get('min_confidence', type=float)
+        recommendation = request.args.get('recommendation')
+        sort = request.args.get('sort')
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        fields = request.args.get('fields')
+        q = request.args.get('q')
+
+        logger.debug("Searching properties: q=%s locations=%s min_price=%s max_price=%s type=%s min_bedrooms=%s",
+                     q, locations, min_price, max_price, property_type, min_bedrooms)
+
+        terms = None
+        if q is not None:
+            terms = text_search.search_terms(q)
+            if not terms:
+                return jsonify({"error": "q must contain at least one word"}), 400
+            sort = sort or RELEVANCE_SORT
+
+        # Passing limit or cursor switches to keyset pagination: {"properties": [...], "next_cursor": ...}
+        paginate = limit is not None or cursor is not None
+        if paginate:
+            sort = sort or "price"
+            limit = min(max(limit or MAX_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+
+        if sort == RELEVANCE_SORT and terms is None:
+            return jsonify({"error": "sort=relevance needs a q search"}), 400
+        if sort is not None and sort not in PROPERTY_SORTS and sort != RELEVANCE_SORT:
+            return jsonify({"error": f"sort must be one of: {', '.join([*PROPERTY_SORTS, RELEVANCE_SORT])}"}), 400
+
+        if fields:
+            fields = [f.strip() for f in fields.split(',') if f.strip()]
+            unknown = [f for f in fields if f not in PROPERTY_FIELDS]
+            if unknown:
+                return jsonify({"error": "Unknown fields requested", "unknown": unknown}), 400
+        else:
+            fields = PROPERTY_FIELDS
 
         query = Property.query
 
@@ -123,6 +319,12 @@ def handle_get_properties():
         if locations:
             filters.append(Property.location.in_(locations))
 
+        if regions:
+            filters.append(Property.region.in_(regions))
+
+        if districts:
+            filters.append(Property.postcode_district.in_(districts))
+
         if min_price is not None:
             filters.append(Property.price >= min_price)
 
@@ -130,37 +332,115 @@ def handle_get_properties():
             filters.append(Property.price <= max_price)
 
         if property_type:
-            filters.append(Property.property_type.ilike(property_type))
+            if '%' in property_type or '_' in property_type:
+                filters.append(Property.property_type.ilike(property_type))
+            else:
+                # Same match as ilike without wildcards, but can use the lower(property_type) index
+                filters.append(func.lower(Property.property_type) == property_type.lower())
 
         if min_bedrooms is not None:
             filters.append(Property.bedrooms >= min_bedrooms)
 
+        if min_confidence is not None:
+            filters.append(Property.confidence >= min_confidence)
+
+        if recommendation:
+            if recommendation not in ("Buy", "Avoid"):
+                return jsonify({"error": "recommendation must be 'Buy' or 'Avoid'"}), 400
+            filters.append(Property.recommendation == recommendation)
+
+        ranked = None
+        headers = {}
+        truncated = False
+        if terms and sort == RELEVANCE_SORT:
+            # The newest matches that pass the filters, scored (see text_search.py).
+            # There are at most CANDIDATES of them, so they are ordered and paged here
+            # and only the listings that are returned get loaded.
+            rows, truncated = text_search.ranked_matches(terms, Property.__table__, filters)
+            headers[TRUNCATED_HEADER] = str(truncated).lower()
+            # (relevance, id), which is also the cursor's key
+            ranked = sorted((relevance, property_id) for property_id, relevance in rows)
+            filters = []
+        elif terms:
+            # Only listings containing every word, in the requested order
+            filters.append(text_search.matches(terms, Property.id))
+
+        if cursor:
+            try:
+                after = decode_cursor(cursor, sort)
+            except (ValueError, TypeError, binascii.Error) as e:
+                return jsonify({"error": "Invalid cursor", "details": str(e)}), 400
+            if ranked is not None:
+                ranked = [key for key in ranked if key > after]
+            else:
+                filters.append(keyset_filter(sort, *after))
+
         if filters:
             query = query.filter(and_(*filters))
 
-        properties = query.all()
+        if sort and ranked is None:
+            column, descending = PROPERTY_SORTS[sort]
+            if descending:
+                # Most likely "Buy" first for score; unscored rows go last
+                query = query.order_by(column.desc(), Property.id.desc())
+            else:
+                query = query.order_by(column, Property.id)
+
+        # Only hydrate the requested columns
+        if set(fields) != set(PROPERTY_FIELDS):
+            query = query.options(load_only(*[getattr(Property, f) for f in fields]))
+
+        if paginate:
+            # The sort value rides along for the cursor; one extra row tells us whether there is a next page
+            if ranked is not None:
+                rows = load_ranked(query, ranked[:limit + 1])
+            else:
+                rows = query.add_columns(PROPERTY_SORTS[sort][0]).limit(limit + 1).all()
+            properties = [row[0] for row in rows[:limit]]
+            next_cursor = None
+            if len(rows) > limit:
+                last_property, last_value = rows[limit - 1]
+                next_cursor = encode_cursor(sort, last_value, last_property.id)
+
+            body = {
+                "properties": [serialize_property(property, fields) for property in properties],
+                "next_cursor": next_cursor
+            }
+            if ranked is not None:
+                body["truncated"] = truncated
+            response = jsonify(body)
+            response.headers.update(headers)
+            return response, 200
+
+        if wants_stream():
+            if ranked is not None:
+                rows = iter([property for property, _ in load_ranked(query, ranked)])
+            else:
+                rows = iter(query.yield_per(STREAM_BATCH_SIZE))
+            first = next(rows, None)
+            if first is None:
+                logger.debug("No properties found matching filters")
+                return jsonify({"error": "No properties found"}), 404
+            response = stream_properties(itertools.chain([first], rows), fields)
+            response.headers.update(headers)
+            return response, 200
+
+        if ranked is not None:
+            properties = [property for property, _ in load_ranked(query, ranked)]
+        else:
+            properties = query.all()
 
         if not properties:
-            print("DEBUG: No properties found matching filters.")
+            logger.debug("No properties found matching filters")
             return jsonify({"error": "No properties found"}), 404
 
-        properties_list = [{
-            "id": property.id,
-            "title": property.title,
-            "price": property.price,
-            "location": property.location,
-            "bedrooms": property.bedrooms,
-            "bathrooms": property.bathrooms,
-            "property_type": property.property_type,
-            "description": property.description,
-            "image_url": property.image_url,
-            "created_by": property.created_by,
-            "source": property.source
-        } for property in properties]
+        properties_list = [serialize_property(property, fields) for property in properties]
 
-        return jsonify(properties_list), 200
+        response = jsonify(properties_list)
+        response.headers.update(headers)
+        return response, 200
     except Exception as e:
-        print(f" ERROR in /api/properties: {str(e)}")
+        logger.exception("Property search failed")
         return jsonify({"error": "Failed to fetch properties", "details": str(e)}), 500
 
 
@@ -169,17 +449,17 @@ def handle_post_property():
     try:
         current_user = get_jwt_identity()
         if not current_user:
-            print("ERROR: No user identity in JWT")
+            logger.warning("No user identity in JWT")
             return jsonify({"error": "Unauthorized - invalid token"}), 401
 
-        print(f"DEBUG: Creating property for user: {current_user}")
+        logger.debug("Creating property for user %s", current_user)
 
         # Validate required form data
         required_fields = ['title', 'price', 'location', 'property_type']
         missing_fields = [field for field in required_fields if not request.form.get(field)]
 
         if missing_fields:
-            print(f"ERROR: Missing required fields: {missing_fields}")
+            logger.info("Property rejected, missing fields: %s", missing_fields)
             return jsonify({
                 "error": "Missing required fields",
                 "missing": missing_fields
@@ -198,28 +478,25 @@ def handle_post_property():
 
         # Validate price is positive
         if form_data['price'] <= 0:
-            print("ERROR: Invalid price value")
+            logger.info("Property rejected, invalid price")
             return jsonify({"error": "Price must be greater than 0"}), 400
 
         # Handle image upload
         image = request.files.get('image')
         if image and allowed_file(image.filename):
-            filename = secure_filename(image.filename)
             try:
-                image_path = os.path.join(
-                    current_app.config['UPLOAD_FOLDER'],
-                    'properties',
-                    filename
-                )
-                image.save(image_path)
+                # Stored under its content hash; resized variants are made in the background
+                folder = os.path.join(current_app.config['UPLOAD_FOLDER'], 'properties')
+                filename = store_upload(image, folder)
+                schedule_variants(folder, filename)
                 image_url = f"/images/properties/{filename}"
-                print(f"DEBUG: Image saved at {image_path}")
+                logger.debug("Image saved at %s", os.path.join(folder, filename))
             except Exception as e:
-                print(f"ERROR saving image: {str(e)}")
+                logger.exception("Saving image failed")
                 image_url = "/images/properties/defaultprop.jpg"
         else:
             image_url = "/images/properties/defaultprop.jpg"
-            print("DEBUG: Using default property image")
+            logger.debug("Using default property image")
 
         # Create new property
         new_property = Property(
@@ -232,14 +509,23 @@ def handle_post_property():
             description=form_data['description'],
             image_url=image_url,
             created_by=current_user,
-            source='user'
+            source='user',
+            **property_location_columns(form_data['title'], form_data['location'])
         )
 
+        try:
+            score_properties([new_property])
+        except Exception as e:
+            # Leave the score empty, backfill_scores.py picks the row up later
+            logger.exception("Scoring property failed")
+
         db.session.add(new_property)
+        bump_data_version(PROPERTIES)
         db.session.commit()
+        property_search_cache.clear()
+        index_properties([new_property])
 
-        print(f"DEBUG: Property created successfully. ID: {new_property.id}")
-        print(f"DEBUG: Property created_by: {new_property.created_by}")
+        logger.info("Property %s created by %s", new_property.id, new_property.created_by)
 
         return jsonify({
             "message": "Property added successfully",
@@ -248,7 +534,7 @@ def handle_post_property():
         }), 201
 
     except ValueError as e:
-        print(f"ERROR: Invalid numeric value - {str(e)}")
+        logger.info("Property rejected, invalid numeric value: %s", e)
         return jsonify({
             "error": "Invalid numeric value",
             "details": str(e)
@@ -256,26 +542,47 @@ def handle_post_property():
 
     except SQLAlchemyError as e:
         db.session.rollback()
-        print(f"DATABASE ERROR: {str(e)}")
+        logger.exception("Database error adding property")
         return jsonify({
             "error": "Database operation failed",
             "details": str(e)
         }), 500
 
     except Exception as e:
-        print(f"UNEXPECTED ERROR: {str(e)}")
+        logger.exception("Adding property failed")
         return jsonify({
             "error": "Failed to add property",
             "details": str(e)
         }), 500
 
+@bp.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({
+        "property_search": property_search_cache.stats(),
+        "recommendations": recommendation_cache.stats()
+    }), 200
+
+
 @bp.route('/api/favourites', methods=['GET'])
 @jwt_required()
 def get_favourites():
     try:
         user_id = get_jwt_identity()
-        print(f"DEBUG: Fetching favourites for user {user_id}")
+        logger.debug("Fetching favourites for user %s", user_id)
 
+        # The body carries property fields too, which change in place (re-ingest, backfills)
+        version, updated_at = get_data_version(favourites_key(user_id))
+        properties_version, properties_updated_at = get_data_version(PROPERTIES)
+        last_modified = max(filter(None, (updated_at, properties_updated_at)), default=None)
+        return conditional_get(f"f{version}-{properties_version}", last_modified, True,
+                               lambda: list_favourites(user_id))
+
+    except Exception as e:
+        logger.exception("Fetching favourites failed")
+        return jsonify({"error": "Failed to fetch saved properties", "details": str(e)}), 500
+
+def list_favourites(user_id):
+    try:
         favourites = (
             db.session.query(Property)
             .join(Favorite, Favorite.property_id == Property.id)
@@ -284,7 +591,7 @@ def get_favourites():
         )
 
         if not favourites:
-            print("DEBUG: No saved properties found for user.")
+            logger.debug("No saved properties found for user %s", user_id)
             return jsonify([]), 200
 
         properties_list = [{
@@ -296,14 +603,16 @@ def get_favourites():
             "bathrooms": property.bathrooms,
             "property_type": property.property_type,
             "description": property.description,
-            "image_url": property.image_url
+            "image_url": property.image_url,
+            "postcode_district": property.postcode_district,
+            "region": property.region
         } for property in favourites]
 
-        print(f" DEBUG: Retrieved {len(properties_list)} saved properties")
+        logger.debug("Retrieved %d saved properties", len(properties_list))
         return jsonify(properties_list), 200
 
     except Exception as e:
-        print(f" ERROR in /api/favourites: {str(e)}")
+        logger.exception("Listing favourites failed")
         return jsonify({"error": "Failed to fetch saved properties", "details": str(e)}), 500
 
 
@@ -323,35 +632,40 @@ def protected():
 @jwt_required()
 def save_favourite():
     try:
-        token = request.headers.get('Authorization')
-        print(f"DEBUG: Received Authorization Header: {token}")  #  Log token
-
         user_id = get_jwt_identity()
-        print(f"DEBUG: Extracted user_id from token: {user_id}")  #  Log extracted user ID
-
         data = request.get_json()
-        print(f"DEBUG: Received request data: {data}")  #  Log request body
-
         property_id = data.get('property_id')
+        logger.debug("Saving property %s for user %s", property_id, user_id)
 
         if not property_id:
-            print(" ERROR: Property ID is missing from request.")
+            logger.info("Save rejected, property ID missing")
             return jsonify({"error": "Property ID is required"}), 400  #  Return clear error message
 
-        existing_favourite = Favorite.query.filter_by(user_id=user_id, property_id=property_id).first()
-        if existing_favourite:
-            print("️ Property already saved for this user.")
-            return jsonify({"error": "Property already saved"}), 400
-
-        new_favourite = Favorite(user_id=user_id, property_id=property_id)
-        db.session.add(new_favourite)
+        # One statement: the unique (user_id, property_id) index decides whether it is new
+        statement = (
+            conflict_insert(Favorite.__table__)
+            .values(user_id=user_id, property_id=property_id)
+            .on_conflict_do_nothing(index_elements=['user_id', 'property_id'])
+        )
+        inserted = db.session.execute(statement).rowcount
+        if inserted:
+            bump_data_version(favourites_key(user_id))
         db.session.commit()
 
-        print(" Property successfully saved!")
+        if not inserted:
+            logger.debug("Property %s already saved", property_id)
+            return jsonify({"error": "Property already saved"}), 400
+
+        logger.debug("Property %s saved", property_id)
         return jsonify({"message": "Property saved successfully!"}), 201
 
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Property not found"}), 404
+
     except Exception as e:
-        print(" ERROR in /api/favourites:", str(e))
+        db.session.rollback()
+        logger.exception("Saving favourite failed")
         return jsonify({"error": "Failed to save property", "details": str(e)}), 500
 
 
@@ -364,26 +678,86 @@ def remove_favourite():
         property_id = data.get('property_id')
 
         if not property_id:
-            print(" ERROR: Property ID is missing from request.")
+            logger.info("Remove rejected, property ID missing")
             return jsonify({"error": "Property ID is required"}), 400
 
-        # Check if the property is saved
-        favourite = Favorite.query.filter_by(user_id=user_id, property_id=property_id).first()
-        if not favourite:
-            print(" ERROR: Property not found in favourites.")
-            return jsonify({"error": "Property not found in favourites"}), 404
-
-        # Remove property from favourites
-        db.session.delete(favourite)
+        # Remove property from favourites; RETURNING tells us whether it was saved
+        removed = db.session.execute(
+            delete(Favorite)
+            .where(Favorite.user_id == user_id, Favorite.property_id == property_id)
+            .returning(Favorite.id)
+        ).first()
+        if removed:
+            bump_data_version(favourites_key(user_id))
         db.session.commit()
 
-        print(f" Property {property_id} removed from favourites for user {user_id}")
+        if not removed:
+            logger.debug("Property %s not in favourites", property_id)
+            return jsonify({"error": "Property not found in favourites"}), 404
+
+        logger.debug("Property %s removed from favourites for user %s", property_id, user_id)
         return jsonify({"message": "Property removed from favourites"}), 200
 
     except Exception as e:
-        print(" ERROR in /api/favourites (DELETE):", str(e))
+        db.session.rollback()
+        logger.exception("Removing favourite failed")
         return jsonify({"error": "Failed to remove property", "details": str(e)}), 500
 
+MAX_FAVOURITES_BULK = 500
+
+@bp.route('/api/favourites/bulk', methods=['POST'])
+@jwt_required()
+def bulk_favourites():
+    # {"add": [property ids], "remove": [property ids]}, applied in one transaction
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json(silent=True) or {}
+
+        try:
+            add_ids = sorted({int(i) for i in data.get('add', [])})
+            remove_ids = sorted({int(i) for i in data.get('remove', [])})
+        except (TypeError, ValueError):
+            return jsonify({"error": "'add' and 'remove' must be lists of property ids"}), 400
+
+        if not add_ids and not remove_ids:
+            return jsonify({"error": "Nothing to add or remove"}), 400
+
+        if len(add_ids) + len(remove_ids) > MAX_FAVOURITES_BULK:
+            return jsonify({"error": f"At most {MAX_FAVOURITES_BULK} property ids per request"}), 400
+
+        if set(add_ids) & set(remove_ids):
+            return jsonify({"error": "A property can't be both added and removed"}), 400
+
+        added = removed = 0
+        if add_ids:
+            added = db.session.execute(
+                conflict_insert(Favorite.__table__)
+                .values([{"user_id": user_id, "property_id": property_id} for property_id in add_ids])
+                .on_conflict_do_nothing(index_elements=['user_id', 'property_id'])
+            ).rowcount
+
+        if remove_ids:
+            removed = len(db.session.execute(
+                delete(Favorite)
+                .where(Favorite.user_id == user_id, Favorite.property_id.in_(remove_ids))
+                .returning(Favorite.id)
+            ).all())
+
+        if added or removed:
+            bump_data_version(favourites_key(user_id))
+        db.session.commit()
+
+        return jsonify({"added": added, "removed": removed}), 200
+
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "One or more properties not found"}), 404
+
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Bulk favourites update failed")
+        return jsonify({"error": "Failed to update favourites", "details": str(e)}), 500
+
 @bp.route('/api/properties/<int:property_id>', methods=['DELETE'])
 @jwt_required()
 def delete_property(property_id):
@@ -400,15 +774,56 @@ def delete_property(property_id):
             return jsonify({"error": "You do not have permission to delete this property"}), 403
 
         db.session.delete(property_to_delete)
+        bump_data_version(PROPERTIES)
         db.session.commit()
+        property_search_cache.clear()
+        forget_properties([property_id])
 
         return jsonify({"message": "Property deleted successfully"}), 200
 
     except Exception as e:
-        print("Error in delete_property:", str(e))
+        logger.exception("Deleting property failed")
         return jsonify({"error": "Failed to delete property"}), 500
 
 
+DEFAULT_SIMILAR = 10
+MAX_SIMILAR = 50
+
+@bp.route('/api/properties/<int:property_id>/similar', methods=['GET'])
+def similar_properties(property_id):
+    k = request.args.get('k', DEFAULT_SIMILAR, type=int)
+    if not 1 <= k <= MAX_SIMILAR:
+        return jsonify({"error": f"k must be an integer from 1 to {MAX_SIMILAR}"}), 400
+
+    version, updated_at = get_data_version(PROPERTIES)
+    etag = f"s{version}-{property_id}-{k}"
+    return conditional_get(etag, updated_at, False, lambda: find_similar_properties(property_id, k, version))
+
+def find_similar_properties(property_id, k, version):
+    target = db.session.get(Property, property_id)
+    if target is None:
+        return jsonify({"error": "Property not found"}), 404
+
+    index = get_similarity_index()
+    refresh_similarity_index(index, version)
+    vector = listing_vectors([target])[0]
+    # Neighbours another worker deleted are only found missing here; drop them and ask again
+    for _ in range(3):
+        neighbours = index.query(vector, k, exclude=property_id)
+        ids = [neighbour_id for neighbour_id, _ in neighbours]
+        found = {p.id: p for p in Property.query.filter(Property.id.in_(ids))}
+        missing = [neighbour_id for neighbour_id in ids if neighbour_id not in found]
+        if not missing:
+            break
+        index.remove(missing)
+
+    return jsonify({
+        "property_id": property_id,
+        "similar": [dict(serialize_property(found[neighbour_id]), distance=round(distance, 4))
+                    for neighbour_id, distance in neighbours if neighbour_id in found],
+    }), 200
+
+
 @bp.route('/api/properties/<int:property_id>/check-ownership', methods=['GET'])
 @jwt_required()
 def check_ownership(property_id):
@@ -438,147 +853,193 @@ def delete_property_by_id(property_id):
             return jsonify({"error": "Unauthorized – You do not own this property"}), 403
 
         db.session.delete(property)
+        bump_data_version(PROPERTIES)
         db.session.commit()
+        property_search_cache.clear()
+        forget_properties([property_id])
 
         return jsonify({"message": "Property deleted successfully"}), 200
 
     except Exception as e:
         db.session.rollback()
-        print(f"ERROR deleting property: {str(e)}")
+        logger.exception("Deleting property failed")
         return jsonify({
             "error": "Failed to delete property",
             "details": str(e)
         }), 500
 
 
-REGION_MAP = {
-    'N': 'North', 'NW': 'North',
-    'E': 'East',
-    'SE': 'South', 'SW': 'South', 'S': 'South',
-    'W': 'West',
-    'WC': 'Central', 'EC': 'Central'
-}
-
-def extract_region_from_title(title):
-    import re
-    match = re.search(r'([A-Z]{1,2})\d{1,2}[A-Z]?', title.strip().split(',')[-1].strip())
-    prefix = match.group(1) if match else 'UNK'
-    return REGION_MAP.get(prefix, 'Other')
+MAX_RECOMMEND_BATCH = 500
+
+def parse_recommendation_request(data):
+    # Raises TypeError/ValueError/AttributeError for unusable input. The features
+    # divide by price, bedrooms and floor area, so those must be positive.
+    parsed = {
+        "price": float(data.get("price")),
+        "bedrooms": int(data.get("bedrooms", 1)),
+        "bathrooms": int(data.get("bathrooms", 1)),
+        "sizeSqFeetMax": float(data.get("sizeSqFeetMax", DEFAULT_SQFT)),
+        "property_type": data.get("property_type", "Other"),
+        "region": data.get("region", "Other"),
+    }
+    for key in ("price", "bedrooms", "sizeSqFeetMax"):
+        if not (math.isfinite(parsed[key]) and parsed[key] > 0):
+            raise ValueError(f"{key} must be a positive number")
+    if parsed["bathrooms"] < 0:
+        raise ValueError("bathrooms can't be negative")
+    return parsed
+
+def prepare_recommendation_inputs(requests):
+    # Parsed requests -> (per-request inputs for the response, feature matrix for the model).
+    # Rent and growth are derived from the property itself, so the same property
+    # always gets the same answer (and the same prediction cache entry).
+    columns = {key: [r[key] for r in requests] for key in requests[0]}
+    columns["estimated_rent"], growth_rates = listing_assumptions(columns)
+    X = feature_matrix(columns)
+
+    inputs = [{
+        "price": r["price"],
+        "estimated_rent": float(estimated_rent),
+        "rent_to_price_ratio": float(ratio),
+        "growth_rate": float(growth_rate),
+        "benchmark_growth": REGION_BENCHMARK_RATES.get(r["region"], 0.035),
+    } for r, estimated_rent, ratio, growth_rate in zip(
+        requests, columns["estimated_rent"], X[:, FEATURE_COLUMN["rent_to_price_ratio"]], growth_rates
+    )]
+    return inputs, X
+
+def build_recommendation_response(inputs, result):
+    price = inputs["price"]
+    estimated_rent = inputs["estimated_rent"]
+    growth_rate = inputs["growth_rate"]
+    benchmark_growth = inputs["benchmark_growth"]
+    roi = inputs["rent_to_price_ratio"] + (growth_rate * 100)
+
+    price_projection = [round(price * ((1 + growth_rate) ** i)) for i in range(6)]
+    benchmark_projection = [round(price * ((1 + benchmark_growth) ** i)) for i in range(6)]
+    benchmark_roi = 7.5
+    growth_threshold = 4.5  # Now explicitly tracked
+
+    recommendation = result["recommendation"]
+
+    show_growth_chart = (
+        (recommendation == "Buy" and growth_rate >= benchmark_growth) or
+        (recommendation == "Avoid" and growth_rate < benchmark_growth)
+    )
+
+    show_roi_chart = not show_growth_chart
+
+    if not show_growth_chart:
+        if recommendation == "Buy" and roi > benchmark_roi:
+            explanation = (
+                f"Although growth is weaker than market average ({growth_rate * 100:.2f}% vs {benchmark_growth * 100:.2f}%), "
+                f"the ROI is strong at {roi:.2f}%, well above the benchmark ROI of {benchmark_roi}%."
+            )
+        elif recommendation == "Avoid" and roi < benchmark_roi:
+            explanation = (
+                f"Despite a strong growth rate of {growth_rate * 100:.2f}%, the ROI is only {roi:.2f}%, "
+                f"which is below the benchmark of {benchmark_roi}%. This suggests it may not be a worthwhile investment."
+            )
+        elif recommendation == "Avoid" and roi > benchmark_roi:
+            explanation = (
+                f"Although ROI is strong at {roi:.2f}%, the growth rate of {growth_rate * 100:.2f}% is too weak compared to the threshold of {growth_threshold}%. "
+                f"Avoid unless other factors are favorable."
+            )
+        elif recommendation == "Buy" and roi < benchmark_roi:
+            explanation = (
+                f"Growth rate of {growth_rate * 100:.2f}% exceeds expectations, justifying a buy despite ROI of {roi:.2f}% being near or below the benchmark ROI of {benchmark_roi}%."
+            )
+        else:
+            explanation = "The model's recommendation is based on a mix of growth and ROI factors."
+    else:
+        explanation = "The recommendation aligns with the projected growth trend."
+
+    return {
+        **result,
+        "roi": round(roi, 2),
+        "growth_rate": round(growth_rate * 100, 2),
+        "estimated_rent": round(estimated_rent, 2),
+        "price_projection": price_projection,
+        "benchmark_projection": benchmark_projection,
+        "benchmark_growth": round(benchmark_growth * 100, 2),
+        "benchmark_roi": benchmark_roi,
+        "growth_threshold": growth_threshold,
+        "show_growth_chart": show_growth_chart,
+        "show_roi_chart": show_roi_chart,
+        "explanation": explanation
+    }
 
 @bp.route('/api/recommend', methods=['POST'])
 def recommend():
     try:
         data = request.get_json()
+        try:
+            parsed = parse_recommendation_request(data)
+        except (TypeError, ValueError, AttributeError) as e:
+            return jsonify({"error": "Invalid property", "details": str(e)}), 400
 
-        price = float(data.get("price"))
-        bedrooms = int(data.get("bedrooms", 1))
-        bathrooms = int(data.get("bathrooms", 1))
-        sqft = float(data.get("sizeSqFeetMax", 600))
-        property_type = data.get("property_type", "Other")
-        region = data.get("region", "Other")
-
-        price_per_bedroom = price / bedrooms
-        price_per_sqft = price / sqft
-        estimated_rent = price * np.random.uniform(0.0035, 0.0065)
-        rent_to_price_ratio = (estimated_rent * 12) / price * 100
-        bedrooms_per_100k = bedrooms / (price / 100_000)
-
-        growth_rate = np.random.uniform(0.02, 0.06)
-        roi = rent_to_price_ratio + (growth_rate * 100)
-
-        price_projection = [round(price * ((1 + growth_rate) ** i)) for i in range(6)]
-
-        region_benchmark_rates = {
-            "Central": 0.035,
-            "North": 0.030,
-            "South": 0.035,
-            "East": 0.040,
-            "West": 0.030,
-            "Other": 0.035
-        }
-        benchmark_growth = region_benchmark_rates.get(region, 0.035)
-        benchmark_projection = [round(price * ((1 + benchmark_growth) ** i)) for i in range(6)]
-        benchmark_roi = 7.5
-        growth_threshold = 4.5  # Now explicitly tracked
-
-        features = {
-            "price": price,
-            "bedrooms": bedrooms,
-            "bathrooms": bathrooms,
-            "sizeSqFeetMax": sqft,
-            "price_per_bedroom": price_per_bedroom,
-            "price_per_sqft": price_per_sqft,
-            "estimated_rent": estimated_rent,
-            "rent_to_price_ratio": rent_to_price_ratio,
-            "bedrooms_per_100k": bedrooms_per_100k,
-            "region_score": benchmark_growth * 100
-        }
+        inputs, X = prepare_recommendation_inputs([parsed])
+        result = recommend_feature_matrix(X)[0]
 
-        for pt in ["Detached", "Flat", "House", "Semi_Detached", "Terraced", "Other"]:
-            features[f"propertyType_{pt}"] = 1 if property_type == pt else 0
+        return jsonify(build_recommendation_response(inputs[0], result))
 
-        for r in ["North", "South", "East", "West", "Central", "Other"]:
-            features[f"region_{r}"] = 1 if region == r else 0
+    except Exception as e:
+        logger.exception("Recommendation failed")
+        return jsonify({"error": str(e)}), 500
 
-        for f in FEATURES:
-            features.setdefault(f, 0)
+@bp.route('/api/recommend/batch', methods=['POST'])
+def recommend_batch():
+    data = request.get_json(silent=True) or {}
+    properties = data.get("properties")
 
-        result = predict_recommendation(features)
-        recommendation = result["recommendation"]
+    if not isinstance(properties, list) or not properties:
+        return jsonify({"error": "A non-empty 'properties' list is required"}), 400
 
-        show_growth_chart = (
-            (recommendation == "Buy" and growth_rate >= benchmark_growth) or
-            (recommendation == "Avoid" and growth_rate < benchmark_growth)
-        )
+    if len(properties) > MAX_RECOMMEND_BATCH:
+        return jsonify({"error": f"At most {MAX_RECOMMEND_BATCH} properties can be scored per request"}), 400
 
-        show_roi_chart = not show_growth_chart
-
-        if not show_growth_chart:
-            if recommendation == "Buy" and roi > benchmark_roi:
-                explanation = (
-                    f"Although growth is weaker than market average ({growth_rate * 100:.2f}% vs {benchmark_growth * 100:.2f}%), "
-                    f"the ROI is strong at {roi:.2f}%, well above the benchmark ROI of {benchmark_roi}%."
-                )
-            elif recommendation == "Avoid" and roi < benchmark_roi:
-                explanation = (
-                    f"Despite a strong growth rate of {growth_rate * 100:.2f}%, the ROI is only {roi:.2f}%, "
-                    f"which is below the benchmark of {benchmark_roi}%. This suggests it may not be a worthwhile investment."
-                )
-            elif recommendation == "Avoid" and roi > benchmark_roi:
-                explanation = (
-                    f"Although ROI is strong at {roi:.2f}%, the growth rate of {growth_rate * 100:.2f}% is too weak compared to the threshold of {growth_threshold}%. "
-                    f"Avoid unless other factors are favorable."
-                )
-            elif recommendation == "Buy" and roi < benchmark_roi:
-                explanation = (
-                    f"Growth rate of {growth_rate * 100:.2f}% exceeds expectations, justifying a buy despite ROI of {roi:.2f}% being near or below the benchmark ROI of {benchmark_roi}%."
-                )
-            else:
-                explanation = "The model's recommendation is based on a mix of growth and ROI factors."
-        else:
-            explanation = "The recommendation aligns with the projected growth trend."
+    parsed = []
+    for index, item in enumerate(properties):
+        try:
+            parsed.append(parse_recommendation_request(item))
+        except (TypeError, ValueError, AttributeError) as e:
+            return jsonify({"error": "Invalid property in batch", "index": index, "details": str(e)}), 400
+
+    try:
+        # Features for the whole batch as one matrix and one predict_proba pass;
+        # results stay in input order
+        inputs, X = prepare_recommendation_inputs(parsed)
+        results = recommend_feature_matrix(X)
 
         return jsonify({
-            **result,
-            "roi": round(roi, 2),
-            "growth_rate": round(growth_rate * 100, 2),
-            "estimated_rent": round(estimated_rent, 2),
-            "price_projection": price_projection,
-            "benchmark_projection": benchmark_projection,
-            "benchmark_growth": round(benchmark_growth * 100, 2),
-            "benchmark_roi": benchmark_roi,
-            "growth_threshold": growth_threshold,
-            "show_growth_chart": show_growth_chart,
-            "show_roi_chart": show_roi_chart,
-            "explanation": explanation
+            "results": [build_recommendation_response(i, r) for i, r in zip(inputs, results)]
         })
 
     except Exception as e:
-        print("Error in recommendation route:", e)
+        logger.exception("Batch recommendation failed")
         return jsonify({"error": str(e)}), 500
 
+def rounded(values):
+    return np.round(values, 2).tolist()
+
+def invalid_projection_inputs(mortgage_rate, appreciation_rate, rent_growth, *amounts):
+    # Why a projection can't be run on these inputs (rates as decimals), or None.
+    # Anything let through here could put NaN or inf into the response JSON.
+    if not all(map(math.isfinite, (mortgage_rate, appreciation_rate, rent_growth, *amounts))):
+        return "Simulation inputs must be finite numbers"
+    if mortgage_rate < 0:
+        return "mortgage_rate can't be negative"
+    if appreciation_rate <= -1 or rent_growth <= -1:
+        return "appreciation_rate and rent_growth must be above -100"
+    return None
+
+def all_finite(results):
+    return all(np.isfinite(values).all() for values in results.values())
+
 @bp.route('/api/simulate', methods=['POST'])
 def simulate_investment():
+    # Deterministic projection from a month-by-month amortization schedule. Sending
+    # "paths" adds a Monte Carlo run with P10/P50/P90 bands per year.
     data = request.get_json()
 
     try:
@@ -590,41 +1051,147 @@ def simulate_investment():
         appreciation_rate = float(data.get("appreciation_rate")) / 100
         years = int(data.get("years"))
         mortgage_term = int(data.get("mortgage_term"))
+        rent_growth = float(data.get("rent_growth", 0)) / 100
+        paths = int(data.get("paths", 0))
+
+        if not 1 <= years <= MAX_YEARS or not 1 <= mortgage_term <= MAX_YEARS:
+            return jsonify({"error": f"years and mortgage_term must be between 1 and {MAX_YEARS}"}), 400
+        if not 0 <= paths <= MAX_PATHS:
+            return jsonify({"error": f"paths must be between 0 and {MAX_PATHS}"}), 400
+        error = invalid_projection_inputs(mortgage_rate, appreciation_rate, rent_growth,
+                                          property_price, down_payment, rental_income)
+        if error:
+            return jsonify({"error": error}), 400
+        if property_price <= 0:
+            return jsonify({"error": "property_price must be positive"}), 400
+        if not 0 <= down_payment <= property_price:
+            return jsonify({"error": "down_payment must be between 0 and property_price"}), 400
+        if rental_income < 0:
+            return jsonify({"error": "rental_income can't be negative"}), 400
+
+        yearly = project(property_price, down_payment, mortgage_rate, rental_income,
+                         appreciation_rate, years, mortgage_term, rent_growth)
+        summary = summarize(yearly)
+        if not (all_finite(yearly) and all_finite(summary)):
+            return jsonify({"error": "Simulation inputs are out of range"}), 400
+
+        result = {key: rounded(value) for key, value in summary.items()}
+        result["yearly"] = {"year": list(range(1, years + 1)), **{key: rounded(values) for key, values in yearly.items()}}
+
+        if paths:
+            # Volatilities and rates in percent, like the other inputs
+            options = {
+                key: float(data[key]) / 100
+                for key in ("appreciation_volatility", "rent_growth_volatility", "void_rate", "rate_reset_volatility")
+                if key in data
+            }
+            if "rate_reset_years" in data:
+                options["rate_reset_years"] = int(data["rate_reset_years"])
+            if not all(math.isfinite(value) and value >= 0 for value in options.values()):
+                return jsonify({"error": "Monte Carlo volatilities and rates must be non-negative numbers"}), 400
+            if options.get("void_rate", 0) > 1:
+                return jsonify({"error": "void_rate must be at most 100"}), 400
+            bands = monte_carlo(property_price, down_payment, mortgage_rate, rental_income, appreciation_rate,
+                                years, mortgage_term, paths, rent_growth, seed=data.get("seed"), **options)
+            if not (all_finite(bands["equity"]) and all_finite(bands["cash_flow"])):
+                return jsonify({"error": "Simulation inputs are out of range"}), 400
+            result["monte_carlo"] = {
+                "paths": paths,
+                "equity": {band: rounded(values) for band, values in bands["equity"].items()},
+                "cash_flow": {band: rounded(values) for band, values in bands["cash_flow"].items()},
+                "probability_negative_equity": np.round(bands["probability_negative_equity"], 4).tolist()
+            }
+
+        return jsonify(result)
 
-        # Loan details
-        loan_amount = property_price - down_payment
-        monthly_rate = mortgage_rate / 12
-        total_months = years * 12
-        mortgage_months = mortgage_term * 12
-
-        # Monthly mortgage payment using amortization formula
-        if monthly_rate == 0:
-            monthly_mortgage_payment = loan_amount / mortgage_months
-        else:
-            monthly_mortgage_payment = loan_amount * monthly_rate / (1 - math.pow(1 + monthly_rate, -mortgage_months))
-
-        # How many months paid
-        months_paid = min(total_months, mortgage_months)
-        total_mortgage_paid = monthly_mortgage_payment * months_paid
-
-        # Future property value
-        future_value = property_price * math.pow(1 + appreciation_rate, years)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
 
-        # Total rental income over the period
-        total_rent_income = rental_income * 12 * years
+MAX_PORTFOLIO_PROPERTIES = 500
 
-        # Projected net equity = future property value - outstanding mortgage
-        # Outstanding mortgage = loan amount - total principal repaid (simplified assumption: no overpayment focus)
-        outstanding_mortgage = max(loan_amount - (monthly_mortgage_payment * months_paid), 0)
-        projected_net_equity = future_value - outstanding_mortgage
+@bp.route('/api/simulate/portfolio', methods=['POST'])
+@jwt_required()
+def simulate_portfolio():
+    # Same projection as /api/simulate for many properties at once, as one
+    # (property x month) array computation. Defaults to the caller's favourites.
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    if not isinstance(data.get("rental_income") or {}, dict):
+        return jsonify({"error": "rental_income must be an object of monthly rents by property id"}), 400
 
-        return jsonify({
-            "future_value": round(future_value, 2),
-            "total_rent_income": round(total_rent_income, 2),
-            "total_mortgage_paid": round(total_mortgage_paid, 2),
-            "projected_net_equity": round(projected_net_equity, 2),
-            "equity_percent": round((projected_net_equity / future_value) * 100, 2)
-        })
+    try:
+        down_payment_percent = float(data.get("down_payment_percent", 25)) / 100
+        mortgage_rate = float(data.get("mortgage_rate")) / 100
+        appreciation_rate = float(data.get("appreciation_rate")) / 100
+        years = int(data.get("years"))
+        mortgage_term = int(data.get("mortgage_term", 25))
+        rent_growth = float(data.get("rent_growth", 0)) / 100
+        # Monthly rent per property id; otherwise the same yield used for stored scores
+        rents = {int(key): float(value) for key, value in (data.get("rental_income") or {}).items()}
+        property_ids = data.get("property_ids")
+        if property_ids is not None:
+            property_ids = sorted({int(i) for i in property_ids})
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid simulation inputs: {str(e)}"}), 400
+
+    if not 1 <= years <= MAX_YEARS or not 1 <= mortgage_term <= MAX_YEARS:
+        return jsonify({"error": f"years and mortgage_term must be between 1 and {MAX_YEARS}"}), 400
+    if not 0 <= down_payment_percent <= 1:
+        return jsonify({"error": "down_payment_percent must be between 0 and 100"}), 400
+    error = invalid_projection_inputs(mortgage_rate, appreciation_rate, rent_growth, *rents.values())
+    if error:
+        return jsonify({"error": error}), 400
+    if any(rent < 0 for rent in rents.values()):
+        return jsonify({"error": "rental_income can't be negative"}), 400
+    if property_ids is not None and not 1 <= len(property_ids) <= MAX_PORTFOLIO_PROPERTIES:
+        return jsonify({"error": f"Between 1 and {MAX_PORTFOLIO_PROPERTIES} property ids per request"}), 400
+
+    query = db.session.query(Property.id, Property.title, Property.price, Property.bedrooms, Property.bathrooms,
+                             Property.property_type, Property.region, Property.location)
+    if property_ids is None:
+        query = query.join(Favorite, Favorite.property_id == Property.id).filter(Favorite.user_id == get_jwt_identity())
+    else:
+        query = query.filter(Property.id.in_(property_ids))
+    rows = query.order_by(Property.id).limit(MAX_PORTFOLIO_PROPERTIES).all()
+
+    if not rows:
+        return jsonify({"error": "No properties to simulate"}), 404
+
+    ids = np.array([row.id for row in rows])
+    price = np.array([row.price for row in rows], dtype=float)
+    down_payment = price * down_payment_percent
+    # Without a rent from the caller, a listing gets the rent /api/recommend estimates for it
+    estimated_rents = property_columns(rows)["estimated_rent"]
+    rental_income = np.array([rents.get(row.id, estimated) for row, estimated in zip(rows, estimated_rents)])
+
+    yearly = project(price, down_payment, mortgage_rate, rental_income, appreciation_rate,
+                     years, mortgage_term, rent_growth)
+    per_property = summarize(yearly)
+    if not (all_finite(yearly) and all_finite(per_property)):
+        return jsonify({"error": "Simulation inputs are out of range"}), 400
+    portfolio = {key: values.sum(axis=0) for key, values in yearly.items()}
+
+    properties = [
+        {
+            "id": int(property_id),
+            "title": row.title,
+            "price": row.price,
+            "down_payment": round(float(down_payment[i]), 2),
+            "rental_income": round(float(rental_income[i]), 2),
+            **{key: round(float(values[i]), 2) for key, values in per_property.items()}
+        }
+        for i, (property_id, row) in enumerate(zip(ids, rows))
+    ]
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "properties": properties,
+        "missing": sorted(set(property_ids) - set(ids.tolist())) if property_ids is not None else [],
+        "portfolio": {
+            "count": len(rows),
+            "total_price": round(float(price.sum()), 2),
+            "total_down_payment": round(float(down_payment.sum()), 2),
+            **{key: rounded(value) for key, value in summarize(portfolio).items()},
+            "yearly": {"year": list(range(1, years + 1)), **{key: rounded(values) for key, values in portfolio.items()}}
+        }
+    }), 200
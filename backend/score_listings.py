@@ -0,0 +1,80 @@
+# run this file to score a whole listings CSV (same format as models/realestate_data_london_2024_nov.csv)
+# offline and write the results to a Parquet file:
+#   python score_listings.py [path/to/listings.csv] [--output listing_scores.parquet] [--chunk-size N]
+# Needs no database or server; features come from features.py, exactly as the API builds them.
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import REGIONS, PROPERTY_TYPES, listing_features
+from recomendation import MODEL_VERSION, predict_proba, model_classes
+
+DEFAULT_CSV = os.path.join(os.path.dirname(__file__), "models", "realestate_data_london_2024_nov.csv")
+DEFAULT_OUTPUT = "listing_scores.parquet"
+CHUNK_SIZE = 100_000
+CSV_COLUMNS = ["title", "propertyType", "sizeSqFeetMax", "bedrooms", "bathrooms", "price"]
+
+
+def score_chunk(chunk):
+    # One predict_proba pass per chunk; rows that can't be scored (POA, no bedrooms...) are dropped
+    df, X = listing_features(chunk)
+    if df.empty:
+        return None
+    proba = predict_proba(X)
+    classes = model_classes()
+    best = proba.argmax(axis=1)
+    return pd.DataFrame({
+        "row": df.index.to_numpy(np.int64),  # 0-based data row in the CSV, to join results back
+        "title": df["title"].to_numpy(),
+        "price": df["price"].to_numpy(np.float64),
+        "region": pd.Categorical(df["region"], categories=REGIONS),
+        "property_type": pd.Categorical(df["property_type"], categories=PROPERTY_TYPES),
+        "estimated_rent": df["estimated_rent"].to_numpy(np.float32),
+        "growth_rate": df["growth_rate"].to_numpy(np.float32),
+        "recommendation": pd.Categorical(np.where(classes[best] == 1, "Buy", "Avoid"), categories=["Avoid", "Buy"]),
+        "confidence": np.round(proba[np.arange(len(best)), best] * 100, 1).astype(np.float32),
+        "investment_score": np.round(proba[:, list(classes).index(1)] * 100, 2).astype(np.float32),
+    })
+
+
+def score_file(path, output, chunk_size=CHUNK_SIZE):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    total = 0
+    start = time.perf_counter()
+    try:
+        for chunk in pd.read_csv(path, usecols=CSV_COLUMNS, chunksize=chunk_size, encoding='utf-8-sig'):
+            scored = score_chunk(chunk)
+            if scored is None:
+                continue
+            table = pa.Table.from_pandas(scored, preserve_index=False)
+            if writer is None:
+                schema = table.schema.with_metadata({**(table.schema.metadata or {}), b"model_version": MODEL_VERSION.encode()})
+                writer = pq.ParquetWriter(output, schema, compression="zstd")
+            writer.write_table(table.cast(writer.schema))
+
+            total += len(scored)
+            elapsed = time.perf_counter() - start
+            print(f"Scored {total} listings ({total / elapsed:,.0f} rows/s)")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return total, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a listings CSV into a Parquet file")
+    parser.add_argument("path", nargs="?", default=DEFAULT_CSV)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    total, elapsed = score_file(args.path, args.output, args.chunk_size)
+    print(f"Scoring complete, {total} listings in {elapsed:.1f}s "
+          f"({total / elapsed if elapsed else 0:,.0f} rows/s), model {MODEL_VERSION} -> {args.output}")
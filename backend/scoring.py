@@ -0,0 +1,80 @@
+# backend/scoring.py
+# Scores Property rows with the recommendation model and stores the result on the
+# row, so listings can be filtered and ranked by score in SQL.
+import logging
+
+import numpy as np
+from sqlalchemy import or_
+
+from extensions import db
+from models import Property
+from features import DEFAULT_SQFT, feature_matrix, listing_assumptions
+from recomendation import MODEL_VERSION, predict_proba, model_classes
+from utils import property_region
+from data_versions import PROPERTIES, bump_data_version
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def property_columns(properties):
+    # Stored rows as the columns features.feature_matrix takes. Listings record no
+    # floor area or rent, so these get the same default size and hashed rent as
+    # /api/recommend gives the listing, and stored scores agree with it.
+    columns = {
+        "price": [float(p.price) for p in properties],
+        "bedrooms": [p.bedrooms or 1 for p in properties],
+        "bathrooms": [p.bathrooms or 1 for p in properties],
+        "sizeSqFeetMax": [DEFAULT_SQFT] * len(properties),
+        "property_type": [p.property_type for p in properties],
+        "region": [p.region or property_region(p.title, p.location) for p in properties],
+    }
+    columns["estimated_rent"], _ = listing_assumptions(columns)
+    return columns
+
+
+def score_properties(properties):
+    # One predict_proba pass for every row; sets the score columns in place
+    if not properties:
+        return
+    proba = predict_proba(feature_matrix(property_columns(properties)))
+    classes = model_classes()
+    buy_column = list(classes).index(1)
+    for prop, row in zip(properties, proba):
+        best = int(np.argmax(row))
+        prop.recommendation = "Buy" if classes[best] == 1 else "Avoid"
+        prop.confidence = round(float(row[best]) * 100, 1)
+        prop.investment_score = round(float(row[buy_column]) * 100, 2)
+        prop.model_version = MODEL_VERSION
+
+
+def stale_scores_filter():
+    return or_(Property.model_version.is_(None), Property.model_version != MODEL_VERSION)
+
+
+def backfill_scores(batch_size=BACKFILL_BATCH_SIZE):
+    """Scores rows that were never scored or were scored by another model version.
+
+    Walks the table in primary-key order, committing once per batch, and
+    returns the number of rows scored.
+    """
+    scored = 0
+    last_id = 0
+    while True:
+        batch = (
+            Property.query
+            .filter(stale_scores_filter(), Property.id > last_id)
+            .order_by(Property.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            return scored
+
+        score_properties(batch)
+        bump_data_version(PROPERTIES)
+        db.session.commit()
+        scored += len(batch)
+        last_id = batch[-1].id
+        logger.info("Scored %d properties (up to id %d)", scored, last_id)
@@ -0,0 +1,93 @@
+# backend/search_cache.py
+# In-process LRU + TTL cache for GET /api/properties. Entries are the already
+# encoded JSON bodies, so a hit skips both the database and jsonify.
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class SearchCache:
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024, ttl=60.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, body, status, headers)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key_for(args):
+        # Same filters in any order (and any location order) share one entry
+        return tuple(sorted((name, tuple(sorted(values))) for name, values in args.lists()))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, body, status, headers = entry
+            if expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body, status, headers
+
+    def put(self, key, body, status=200, headers=()):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock() + self.ttl, body, status, tuple(headers))
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key):
+        _, body, _, _ = self._entries.pop(key)
+        self._bytes -= len(body)
+
+
+# Each worker process has its own cache. Callers key entries by the properties data
+# version, so a write anywhere makes every older entry unreachable; writes also
+# clear this worker's cache to free the memory straight away
+property_search_cache = SearchCache(
+    max_entries=int(os.getenv("PROPERTY_CACHE_MAX_ENTRIES", 256)),
+    max_bytes=int(os.getenv("PROPERTY_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+    ttl=float(os.getenv("PROPERTY_CACHE_TTL", 60)),
+)
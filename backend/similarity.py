@@ -0,0 +1,240 @@
+# backend/similarity.py
+# Nearest-neighbour index behind GET /api/properties/<id>/similar. Listings are
+# compared on what they actually record: price (on a log scale, so a 10% gap counts
+# the same at any price), bedrooms, bathrooms, region and property type. The model's
+# FEATURES aren't used: its rent columns are hashed draws, not listing attributes,
+# and the derived columns repeat price and region. The numeric columns are
+# standardized over the table and each column is scaled by its WEIGHTS entry; a
+# scikit-learn KDTree over the whole table is built once per process (in the
+# gunicorn master with preload, so workers share it).
+#
+# The tree can't be changed after it is built, so changes are kept beside it:
+# listings added since the build sit in a small array searched by brute force, and
+# deleted ones are tombstones skipped in results. Once either passes
+# REBUILD_FRACTION of the tree, or the table has changed and the index is older
+# than MAX_AGE, a new index is loaded from the database in a background thread
+# and swapped in.
+#
+# Every worker holds its own copy. Writes a worker handles update its copy at once;
+# inserts made elsewhere (other workers, ingest_listings.py) are picked up through
+# the properties data version, and deletes when a neighbour is missing from the
+# database. Edits to existing rows (re-ingested prices) wait for the next rebuild.
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+
+from extensions import db
+from models import Property
+from features import PROPERTY_TYPES, REGIONS, normalize_property_types, normalize_regions
+from utils import property_region
+from data_versions import PROPERTIES, get_data_version
+
+logger = logging.getLogger(__name__)
+
+LEAF_SIZE = 40
+LOAD_BATCH_SIZE = 50_000
+# Added or deleted listings tolerated outside the tree, as a fraction of it (with a floor)
+REBUILD_FRACTION = float(os.getenv("SIMILAR_REBUILD_FRACTION", 0.05))
+MIN_REBUILD = 1_000
+MAX_AGE = float(os.getenv("SIMILAR_INDEX_MAX_AGE", 3600))
+
+LISTING_COLUMNS = (Property.id, Property.price, Property.bedrooms, Property.bathrooms,
+                   Property.property_type, Property.region, Property.title, Property.location)
+
+# Distance added by one standard deviation of log price, bedrooms or bathrooms, or by
+# a different region or property type
+PRICE_WEIGHT = 2.0
+BEDROOMS_WEIGHT = 1.0
+BATHROOMS_WEIGHT = 0.5
+REGION_WEIGHT = 1.0
+TYPE_WEIGHT = 1.0
+
+NUMERIC = 3  # log price, bedrooms, bathrooms; then the region and type one-hots
+DIMENSIONS = NUMERIC + len(REGIONS) + len(PROPERTY_TYPES)
+# Two one-hot rows that differ do so in two columns, hence the sqrt(2)
+WEIGHTS = np.array([PRICE_WEIGHT, BEDROOMS_WEIGHT, BATHROOMS_WEIGHT]
+                   + [REGION_WEIGHT / np.sqrt(2)] * len(REGIONS)
+                   + [TYPE_WEIGHT / np.sqrt(2)] * len(PROPERTY_TYPES))
+
+
+def listing_vectors(properties):
+    # Property rows (or rows of LISTING_COLUMNS) as unweighted rows of DIMENSIONS columns
+    X = np.zeros((len(properties), DIMENSIONS))
+    X[:, 0] = np.log(np.maximum([float(p.price) for p in properties], 1.0))
+    X[:, 1] = [p.bedrooms or 0 for p in properties]
+    X[:, 2] = [p.bathrooms or 0 for p in properties]
+    regions = normalize_regions([p.region or property_region(p.title, p.location) for p in properties])
+    X[:, NUMERIC:NUMERIC + len(REGIONS)] = regions[:, None] == np.array(REGIONS)
+    types = normalize_property_types([p.property_type for p in properties])
+    X[:, NUMERIC + len(REGIONS):] = types[:, None] == np.array(PROPERTY_TYPES)
+    return X
+
+
+class SimilarityIndex:
+    def __init__(self, ids, X, version=0):
+        from sklearn.neighbors import KDTree
+
+        self.ids = np.asarray(ids, dtype=np.int64)
+        # Only the numeric columns are standardized; the one-hots keep their 0/1
+        self.mean = np.zeros(DIMENSIONS)
+        scale = np.ones(DIMENSIONS)
+        if len(X):
+            self.mean[:NUMERIC] = X[:, :NUMERIC].mean(axis=0)
+            scale[:NUMERIC] = X[:, :NUMERIC].std(axis=0)
+            # A column every listing shares carries no distance
+            scale[scale == 0] = 1.0
+        self.scale = scale / WEIGHTS
+        self.tree = KDTree(self.standardize(X), leaf_size=LEAF_SIZE) if len(X) else None
+        # Highest id read from the table; listings this worker added may be higher
+        self.max_id = int(self.ids.max()) if len(self.ids) else 0
+        self.version = version
+        self.built_at = time.monotonic()
+
+        # Replaced rather than mutated, so queries can read them without the lock
+        self._added_ids = []
+        self._added = np.empty((0, DIMENSIONS))
+        self._added_rows = {}
+        self._deleted = frozenset()
+        self._lock = threading.Lock()
+
+    def standardize(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+
+    def add(self, ids, X):
+        """Indexes listings. An id already indexed takes the new row, which also
+        covers SQLite handing a deleted listing's id to the next insert."""
+        with self._lock:
+            added_ids, added, rows = list(self._added_ids), self._added.copy(), dict(self._added_rows)
+            new = []
+            ids = [int(i) for i in ids]
+            for n, i in enumerate(ids):
+                if i in rows:
+                    added[rows[i]] = self.standardize(X[n])
+                else:
+                    rows[i] = len(added_ids) + len(new)
+                    new.append(n)
+            added_ids += [ids[n] for n in new]
+            self._added = np.vstack([added, self.standardize(X[new])]) if new else added
+            self._added_ids, self._added_rows = added_ids, rows
+            self._deleted = self._deleted.difference(ids)
+
+    def remove(self, ids):
+        with self._lock:
+            self._deleted = self._deleted | {int(i) for i in ids}
+
+    @property
+    def stale(self):
+        limit = max(MIN_REBUILD, REBUILD_FRACTION * len(self.ids))
+        return len(self._added_ids) > limit or len(self._deleted) > limit
+
+    def query(self, vector, k, exclude=None):
+        """The k nearest live listings to a listing_vectors row, as
+        (id, distance) pairs, nearest first."""
+        z = self.standardize(vector).reshape(1, -1)
+        with self._lock:
+            added_ids, added, rows, deleted = self._added_ids, self._added, self._added_rows, self._deleted
+
+        found = []
+        if self.tree is not None:
+            want = k + 1
+            while True:
+                distances, indexes = self.tree.query(z, k=min(want, len(self.ids)))
+                found = [(d, i) for d, i in zip(distances[0].tolist(), self.ids[indexes[0]].tolist())
+                         if i != exclude and i not in deleted and i not in rows]
+                # Rarely loops: only when tombstones or replaced rows crowd out the first k + 1
+                if len(found) >= k or want >= len(self.ids):
+                    break
+                want *= 2
+            found = found[:k]
+        if added_ids:
+            distances = np.sqrt(((added - z) ** 2).sum(axis=1))
+            nearest = np.argsort(distances)[:k + 1 + len(deleted)]
+            found += [(float(distances[n]), added_ids[n]) for n in nearest
+                      if added_ids[n] != exclude and added_ids[n] not in deleted]
+        found.sort()
+        return [(i, d) for d, i in found[:k]]
+
+
+def load_index():
+    """Builds an index over every stored listing (tens of seconds at 1M rows)."""
+    start = time.perf_counter()
+    version, _ = get_data_version(PROPERTIES)
+    ids, vectors = [], []
+    result = db.session.execute(select(*LISTING_COLUMNS).order_by(Property.id)
+                                .execution_options(yield_per=LOAD_BATCH_SIZE))
+    for rows in result.partitions():
+        ids.append(np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows)))
+        vectors.append(listing_vectors(rows))
+    index = SimilarityIndex(np.concatenate(ids) if ids else [],
+                            np.vstack(vectors) if vectors else np.empty((0, DIMENSIONS)), version)
+    logger.info("Similarity index built over %d listings in %.1fs", len(index.ids), time.perf_counter() - start)
+    return index
+
+
+_index = None
+_rebuilding = False
+_index_lock = threading.Lock()
+
+
+def get_similarity_index():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_index()
+    return _index
+
+
+def refresh(index, version):
+    """Indexes listings inserted by other processes since the index last looked,
+    and schedules a rebuild when the index has drifted too far from the table."""
+    if version == index.version:
+        return
+    rows = db.session.execute(select(*LISTING_COLUMNS).where(Property.id > index.max_id)
+                              .order_by(Property.id)).all()
+    if rows:
+        index.add([row.id for row in rows], listing_vectors(rows))
+        index.max_id = rows[-1].id
+    index.version = version
+    if index.stale or time.monotonic() - index.built_at > MAX_AGE:
+        schedule_rebuild()
+
+
+def schedule_rebuild():
+    global _rebuilding
+    with _index_lock:
+        if _rebuilding:
+            return False
+        _rebuilding = True
+    app = current_app._get_current_object()
+    threading.Thread(target=_rebuild, args=(app,), name='similarity-rebuild', daemon=True).start()
+    return True
+
+
+def _rebuild(app):
+    global _index, _rebuilding
+    try:
+        with app.app_context():
+            index = load_index()
+        # Writes since the load started reach the new index through refresh()
+        _index = index
+    except Exception:
+        logger.exception("Rebuilding the similarity index failed")
+    finally:
+        _rebuilding = False
+
+
+def index_properties(properties):
+    # Called after a commit; a process that hasn't built its index yet has nothing to update
+    if _index is not None and properties:
+        _index.add([p.id for p in properties], listing_vectors(properties))
+
+
+def forget_properties(ids):
+    if _index is not None:
+        _index.remove(ids)
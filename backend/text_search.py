@@ -0,0 +1,170 @@
+# backend/text_search.py
+# Full-text search over property titles and descriptions (GET /api/properties?q=).
+#
+# PostgreSQL: a generated tsvector column, title weighted above description, with
+# a GIN index; being generated, it is recomputed on every insert and update. The
+# column is kept in the row (STORAGE MAIN) rather than TOASTed, so testing or
+# ranking a row doesn't cost a TOAST fetch; the description is moved out instead.
+# SQLite: an external-content FTS5 table over the same two columns, kept in step
+# with properties by triggers.
+#
+# The migration creates these on existing databases; attach() adds them to
+# create_all() (create_db.py, the benchmarks) through DDL events on the table.
+#
+# Scoring a match (bm25 / ts_rank_cd) costs far more than finding it, and a word
+# like "garden" is in most listings, so relevance ranking only scores the newest
+# CANDIDATES matches that pass the other filters. ranked_matches() fetches one more
+# than that, which tells the API whether older matches were left out, and it says
+# so in the response. Explicit sorts see every match.
+import os
+import re
+
+from sqlalchemy import DDL, column, event, func, literal_column, select, table
+
+from extensions import db
+
+FTS_TABLE = 'properties_fts'
+# Only words reach either query parser, so user input is never query syntax
+WORD = re.compile(r"\w+")
+MAX_TERMS = 16
+CANDIDATES = int(os.getenv("TEXT_SEARCH_CANDIDATES", 1000))
+# SQLite only: with at least this many matches, an explicit sort walks its own index
+# and tests each row against the matches instead of sorting all of them
+COMMON_MATCHES = 2000
+# bm25 column weights, title over description like 'A' over 'B' in ts_rank_cd
+TITLE_WEIGHT, DESCRIPTION_WEIGHT = 2.5, 1.0
+
+POSTGRESQL_DDL = [
+    "ALTER TABLE properties ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED, "
+    # In the same statement, so the rewrite that fills the column already uses it
+    "ALTER COLUMN search_vector SET STORAGE MAIN",
+    "CREATE INDEX ix_properties_search_vector ON properties USING gin (search_vector)",
+]
+POSTGRESQL_DROP = [
+    "DROP INDEX IF EXISTS ix_properties_search_vector",
+    "ALTER TABLE properties DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(title, description, content='properties', "
+    "content_rowid='id', tokenize='porter unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON properties BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    f"CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON properties BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) "
+    f"VALUES ('delete', old.id, old.title, old.description); END",
+    f"CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF title, description ON properties BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description) "
+    f"VALUES ('delete', old.id, old.title, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    # Indexes the rows already in the table
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+CREATE_DDL = {'postgresql': POSTGRESQL_DDL, 'sqlite': SQLITE_DDL}
+DROP_DDL = {'postgresql': POSTGRESQL_DROP, 'sqlite': SQLITE_DROP}
+
+
+def create_text_index(connection):
+    for statement in CREATE_DDL.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+def drop_text_index(connection):
+    for statement in DROP_DDL.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+def attach(properties_table):
+    for dialect, statements in CREATE_DDL.items():
+        for statement in statements:
+            event.listen(properties_table, 'after_create', DDL(statement).execute_if(dialect=dialect))
+    # The FTS table would outlive a dropped properties table (its triggers don't)
+    event.listen(properties_table, 'before_drop', DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect='sqlite'))
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Keeps autogenerate from dropping what the migration made outside the models
+    if type_ == 'table':
+        return not name.startswith(FTS_TABLE)
+    return name not in ('search_vector', 'ix_properties_search_vector')
+
+
+def search_terms(q):
+    return WORD.findall(q.lower())[:MAX_TERMS]
+
+
+def _tsquery(terms):
+    return func.plainto_tsquery('english', ' '.join(terms))
+
+
+def _fts_query(terms):
+    # Quoted terms separated by spaces: all of them must match
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+def _fts_table():
+    return table(FTS_TABLE, column('rowid'), column(FTS_TABLE))
+
+
+def _match_count(terms, cap):
+    # Matches on SQLite, counting no further than cap
+    fts = _fts_table()
+    found = select(fts.c.rowid).where(fts.c[FTS_TABLE].op('MATCH')(_fts_query(terms))).limit(cap).subquery()
+    return db.session.scalar(select(func.count()).select_from(found))
+
+
+def matches(terms, id_column, dialect=None):
+    """Filter for rows containing every term."""
+    dialect = dialect or db.engine.dialect.name
+    if dialect == 'postgresql':
+        return literal_column('properties.search_vector').op('@@')(_tsquery(terms))
+    if dialect == 'sqlite':
+        fts = _fts_table()
+        found = select(fts.c.rowid).where(fts.c[FTS_TABLE].op('MATCH')(_fts_query(terms)))
+        if _match_count(terms, COMMON_MATCHES) >= COMMON_MATCHES:
+            # SQLite has no statistics on the FTS table and always starts from the
+            # matches; "+ 0" keeps it from doing so, so it walks the sort index instead
+            return (id_column + 0).in_(found)
+        return id_column.in_(found)
+    raise RuntimeError(f"Full-text search is not supported on {dialect}")
+
+
+def ranked_matches(terms, properties, filters=(), limit=CANDIDATES, dialect=None):
+    """(rows, truncated): (id, relevance) rows for the newest `limit` rows that contain
+    every term and pass filters, newest first, and whether older matches were left
+    out. Lower relevance is a better match.
+    """
+    dialect = dialect or db.engine.dialect.name
+    if dialect == 'postgresql':
+        tsquery = _tsquery(terms)
+        vector = literal_column('properties.search_vector')
+        newest = (select(properties.c.id, vector.label('search_vector')).where(vector.op('@@')(tsquery), *filters)
+                  .order_by(properties.c.id.desc()).limit(limit + 1).subquery('newest'))
+        # Scored outside the limit, so ts_rank_cd runs on `limit` + 1 rows at most
+        # whichever way the matches are found
+        ranked = (select(newest.c.id, (-func.ts_rank_cd(newest.c.search_vector, tsquery)).label('relevance'))
+                  .order_by(newest.c.id.desc()))
+    elif dialect == 'sqlite':
+        fts = _fts_table()
+        # FTS5 walks the matches newest first and stops once `limit` + 1 pass the
+        # filters; bm25 only runs on those
+        relevance = func.bm25(literal_column(FTS_TABLE), TITLE_WEIGHT, DESCRIPTION_WEIGHT)
+        ranked = select(fts.c.rowid.label('id'), relevance.label('relevance'))
+        if filters:
+            # Listings are only read when there is something to filter on
+            ranked = ranked.select_from(fts.join(properties, properties.c.id == fts.c.rowid)).where(*filters)
+        ranked = (ranked.where(fts.c[FTS_TABLE].op('MATCH')(_fts_query(terms)))
+                  .order_by(fts.c.rowid.desc()).limit(limit + 1))
+    else:
+        raise RuntimeError(f"Full-text search is not supported on {dialect}")
+    rows = db.session.execute(ranked).all()
+    return rows[:limit], len(rows) > limit
@@ -1,6 +1,52 @@
 # backend/utils.py
 # to avoid a circular import of app.py and routes.py
+import re
+
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+REGION_MAP = {
+    'N': 'North', 'NW': 'North',
+    'E': 'East',
+    'SE': 'South', 'SW': 'South', 'S': 'South',
+    'W': 'West',
+    'WC': 'Central', 'EC': 'Central'
+}
+
+# Postcode district (outward code), optionally followed by the inward code, at the
+# end of a listing title: "..., London, NW3" or "..., SW11 2AB"
+TITLE_POSTCODE = re.compile(r'\b([A-Z]{1,2})(\d[A-Z\d]?)(?:\s+\d[A-Z]{2})?\s*,?\s*$')
+# A match is never longer than this, so searching only the end of the title is enough
+POSTCODE_TAIL = 16
+
+def parse_title_postcode(title):
+    # (postcode district, region), e.g. ("NW3", "North"); (None, 'Other') without a postcode
+    title = title or ''
+    match = TITLE_POSTCODE.search(title, max(len(title) - POSTCODE_TAIL, 0))
+    if match is None:
+        return None, 'Other'
+    area, sector = match.groups()
+    return area + sector, REGION_MAP.get(area, 'Other')
+
+def extract_region_from_title(title):
+    return parse_title_postcode(title)[1]
+
+def extract_region_from_location(location):
+    # Locations are stored as e.g. "North London"
+    first_word = (location or "").strip().split(" ")[0].capitalize()
+    return first_word if first_word in REGION_MAP.values() else 'Other'
+
+def property_region(title, location):
+    region = extract_region_from_title(title)
+    return region if region != 'Other' else extract_region_from_location(location)
+
+def property_location_columns(title, location):
+    # Values for Property.postcode_district and Property.region
+    district, region = parse_title_postcode(title)
+    return {
+        "postcode_district": district,
+        "region": region if region != 'Other' else extract_region_from_location(location),
+    }
@@ -0,0 +1,21 @@
+# backend/wsgi.py
+# Entry point for pre-fork WSGI servers:  gunicorn -c gunicorn.conf.py wsgi:app
+# With preload_app (see gunicorn.conf.py) the master imports this module once, so
+# the app is built and the model and similarity index loaded before forking and
+# every worker starts warm.
+from app import create_app, warm_up
+from extensions import db
+
+app = create_app()
+warm_up(app)
+
+
+def post_fork():
+    """Runs in each worker right after the fork.
+
+    Pooled connections opened in the master must not be shared by the children;
+    dispose(close=False) drops them from this process's pool without closing the
+    sockets the master (or a sibling) may still be using.
+    """
+    with app.app_context():
+        db.engine.dispose(close=False)
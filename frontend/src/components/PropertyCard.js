@@ -161,6 +161,14 @@ const InvestmentModal = ({ isOpen, onClose, isLoading, recommendation, investmen
 };
 
 
+// Uploaded photos are stored under a content hash and have a card-sized variant
+const cardImageUrl = (imageUrl) => {
+  const url = imageUrl || "/images/properties/defaultprop.jpg";
+  return /^\/images\/properties\/[0-9a-f]{32}\.\w+$/.test(url)
+    ? url.replace("/images/properties/", "/images/properties/card/")
+    : url;
+};
+
 const PropertyCard = ({ property, savedProperties = [], isFavouritePage = false, onRemoveFavourite }) => {
   const { user } = useAuth();
   const [isLoading, setIsLoading] = useState(false);
@@ -259,10 +267,11 @@ const PropertyCard = ({ property, savedProperties = [], isFavouritePage = false,
     const body = {
       title: property.title,
       price: property.price,
-      bedrooms: property.bedrooms,
-      bathrooms: property.bathrooms,
-      sizeSqFeetMax: property.sizeSqFeetMax || 600,
-      property_type: property.property_type || "Other"
+      bedrooms: property.bedrooms || 1,
+      bathrooms: property.bathrooms || 1,
+      sizeSqFeetMax: property.sizeSqFeetMax,
+      property_type: property.property_type || "Other",
+      region: property.region || "Other"
     };
 
     try {
@@ -303,7 +312,7 @@ const PropertyCard = ({ property, savedProperties = [], isFavouritePage = false,
   return (
     <div className="property-card">
       <img
-        src={property.image_url || "/images/properties/defaultprop.jpg"}
+        src={cardImageUrl(property.image_url)}
         alt={property.title}
         className="property-image"
       />